@@ -4,6 +4,8 @@ Cliente de Teste para Servidores Web
 Cliente HTTP simplificado que realiza testes de carga e mede performance
 """
 
+import asyncio
+import re
 import socket
 import time
 import sys
@@ -16,159 +18,330 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 import config
 from core.crypto_utils import gerar_custom_id
-from tests.metrics import RequestMetrics, PerformanceMetrics
+from core.socket_utils import configurar_socket, CONTENT_LENGTH_RE
+from tests.metrics import PerformanceMetrics
 from tests.test_scenarios import TestScenarios
 
 
+# Padrão pré-compilado para inspecionar os headers da resposta direto nos bytes
+# Ancorado no \r\n que antecede o header, como CONTENT_LENGTH_RE, para não
+# casar com sufixos de outros nomes nem com texto em valores
+_CONNECTION_CLOSE_RE = re.compile(rb'(?i)\r\nconnection:[ \t]*close')
+
+
+def _parse_response_headers(data, headers_end: int):
+    """
+    Extrai Content-Length e a intenção de manter a conexão a partir do bloco de headers
+
+    Args:
+        data: Buffer (bytes ou bytearray) iniciado pela resposta
+        headers_end: Posição da linha em branco que encerra os headers
+
+    Returns:
+        Tupla (content_length ou None, keep_open)
+    """
+    match = CONTENT_LENGTH_RE.search(data, 0, headers_end)
+    content_length = int(match.group(1)) if match else None
+    keep_open = _CONNECTION_CLOSE_RE.search(data, 0, headers_end) is None
+    return content_length, keep_open
+
+
 class SimpleHTTPClient:
     """Cliente HTTP simplificado e robusto"""
     
+    # Invariantes entre instâncias: o X-Custom-ID é calculado uma vez por
+    # processo e os templates de requisição uma vez por servidor (host, porta)
+    custom_id = gerar_custom_id()
+    _templates: Dict[tuple, tuple] = {}
+    
     def __init__(self, server_host: str = 'localhost', server_port: int = 80, client_id: int = 1):
         self.server_host = server_host
         self.server_port = server_port
         self.client_id = client_id
-        self.custom_id = gerar_custom_id()
+        self._sock = None  # Conexão persistente (keep-alive)
+        self._request_template, self._body_request_template = self._get_templates(server_host, server_port)
+    
+    @classmethod
+    def _get_templates(cls, server_host: str, server_port: int) -> tuple:
+        """
+        Retorna (template sem body, template com body) para o servidor
+        Apenas método, path e body mudam entre requisições: o restante é
+        serializado uma única vez e completado com bytes.__mod__ no envio
+        """
+        key = (server_host, server_port)
+        templates = cls._templates.get(key)
+        if templates is None:
+            fixed_headers = (
+                f"Host: {server_host}:{server_port}\r\n"
+                f"X-Custom-ID: {cls.custom_id}\r\n"
+                "User-Agent: SimpleTestClient/1.0\r\n"
+                "Connection: keep-alive\r\n"
+            ).encode('utf-8').replace(b'%', b'%%')
+            templates = (
+                b"%s %s HTTP/1.1\r\n" + fixed_headers + b"\r\n",
+                b"%s %s HTTP/1.1\r\n" + fixed_headers +
+                b"Content-Length: %d\r\nContent-Type: text/plain; charset=utf-8\r\n\r\n%s"
+            )
+            cls._templates[key] = templates
+        return templates
+    
+    def _connect(self) -> socket.socket:
+        """Abre uma nova conexão TCP com o servidor"""
+        sock = configurar_socket(socket.socket(socket.AF_INET, socket.SOCK_STREAM))
+        sock.settimeout(5.0)
+        sock.connect((self.server_host, self.server_port))
+        self._sock = sock
+        return sock
+    
+    def close(self):
+        """Fecha a conexão persistente, se existir"""
+        if self._sock:
+            try:
+                self._sock.close()
+            except:
+                pass
+            self._sock = None
+    
+    def _build_request(self, method: str, path: str, body: str) -> bytes:
+        """Monta os bytes da requisição HTTP a partir dos templates pré-serializados"""
+        if body:
+            body_bytes = body.encode('utf-8')
+            return self._body_request_template % (method.encode(), path.encode(), len(body_bytes), body_bytes)
+        return self._request_template % (method.encode(), path.encode())
+    
+    def _build_result(self, response_data: Optional[bytes], start_ns: int, end_ns: int) -> Dict[str, Any]:
+        """
+        Converte a resposta bruta no dicionário de resultado
+        Os instantes de início/fim (time.perf_counter_ns, inteiros) são devolvidos
+        junto com a latência para que o chamador não precise medir o tempo de novo;
+        'response_time' em segundos é mantido para exibição
+        """
+        elapsed_ns = end_ns - start_ns
+        if not response_data:
+            return {
+                'status_code': 0,
+                'response_time': elapsed_ns / 1e9,
+                'response_time_ns': elapsed_ns,
+                'start_time_ns': start_ns,
+                'end_time_ns': end_ns,
+                'success': False,
+                'response_size': 0,
+                'error': 'Empty response'
+            }
+        
+        # Status code lido direto dos bytes: "HTTP/1.1 XXX ..." tem os três
+        # dígitos sempre nas posições 9..11, sem decodificar a resposta toda
+        status_code = 0
+        if len(response_data) >= 12 and response_data.startswith(b'HTTP/'):
+            d0, d1, d2 = response_data[9] - 48, response_data[10] - 48, response_data[11] - 48
+            if 0 <= d0 <= 9 and 0 <= d1 <= 9 and 0 <= d2 <= 9:
+                status_code = d0 * 100 + d1 * 10 + d2
+        
+        return {
+            'status_code': status_code,
+            'response_time': elapsed_ns / 1e9,
+            'response_time_ns': elapsed_ns,
+            'start_time_ns': start_ns,
+            'end_time_ns': end_ns,
+            'success': 200 <= status_code < 400,
+            'response_size': len(response_data),
+            'raw_response': response_data[:200].decode('utf-8', errors='ignore')
+        }
+    
+    @staticmethod
+    def _error_result(error: str, start_ns: int) -> Dict[str, Any]:
+        """Monta o resultado de uma requisição que falhou"""
+        end_ns = time.perf_counter_ns()
+        elapsed_ns = end_ns - start_ns
+        return {
+            'status_code': 0,
+            'response_time': elapsed_ns / 1e9,
+            'response_time_ns': elapsed_ns,
+            'start_time_ns': start_ns,
+            'end_time_ns': end_ns,
+            'success': False,
+            'error': error
+        }
     
     def send_request(self, method: str = 'GET', path: str = '/', body: str = '') -> Optional[Dict[str, Any]]:
         """
         Envia requisição HTTP e retorna resultado
-        Cria nova conexão para cada requisição (Connection: close)
+        Reutiliza a mesma conexão TCP entre chamadas (Connection: keep-alive);
+        se o servidor fechar a conexão, uma nova é aberta na próxima chamada
         """
-        sock = None
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         
         try:
-            # Criar socket
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(5.0)
-            sock.connect((self.server_host, self.server_port))
+            reused = self._sock is not None
+            response_data = self._exchange(method, path, body)
             
-            # Construir requisição HTTP
-            request_lines = [
-                f"{method} {path} HTTP/1.1",
-                f"Host: {self.server_host}:{self.server_port}",
-                f"X-Custom-ID: {self.custom_id}",
-                "User-Agent: SimpleTestClient/1.0",
-                "Connection: close"
-            ]
-            
-            # Adicionar Content-Length se houver body
-            if body:
-                body_bytes = body.encode('utf-8')
-                request_lines.append(f"Content-Length: {len(body_bytes)}")
-                request_lines.append("Content-Type: text/plain; charset=utf-8")
-            
-            # Finalizar headers e adicionar body
-            request_lines.append("")
-            request_lines.append(body if body else "")
-            
-            # Enviar requisição
-            request_data = '\r\n'.join(request_lines).encode('utf-8')
-            sock.sendall(request_data)
-            
-            # Receber resposta
-            response_data = b""
-            content_length = None
-            headers_complete = False
+            # Conexão reaproveitada pode ter sido fechada pelo servidor enquanto ociosa
+            if reused and response_data is None:
+                response_data = self._exchange(method, path, body)
             
+            return self._build_result(response_data, start_ns, time.perf_counter_ns())
+                
+        except socket.timeout:
+            self.close()
+            return self._error_result('Timeout', start_ns)
+        except Exception as e:
+            self.close()
+            return self._error_result(str(e), start_ns)
+    
+    def _exchange(self, method: str, path: str, body: str) -> Optional[bytes]:
+        """
+        Envia uma requisição pela conexão persistente e lê exatamente uma resposta
+        Retorna None se a conexão foi fechada antes de qualquer byte da resposta
+        """
+        sock = self._sock if self._sock is not None else self._connect()
+        
+        # Enviar requisição
+        try:
+            sock.sendall(self._build_request(method, path, body))
+        except (BrokenPipeError, ConnectionResetError):
+            self.close()
+            return None
+        
+        # Receber resposta em um buffer pré-alocado, sem concatenar bytes a cada chunk
+        buf = bytearray(8192)
+        view = memoryview(buf)
+        n_read = 0
+        content_length = None
+        headers_end = -1
+        keep_open = True
+        
+        try:
             while True:
-                chunk = sock.recv(4096)
-                if not chunk:
-                    break  # Conexão fechada
+                if n_read == len(buf):
+                    # Buffer cheio: dobrar de tamanho (a view precisa ser liberada antes)
+                    view.release()
+                    buf.extend(bytes(len(buf)))
+                    view = memoryview(buf)
                 
-                response_data += chunk
+                got = sock.recv_into(view[n_read:])
+                if not got:
+                    # Servidor fechou a conexão
+                    keep_open = False
+                    break
+                
+                search_from = max(0, n_read - 3)
+                n_read += got
                 
                 # Verificar se temos headers completos
-                if not headers_complete and b'\r\n\r\n' in response_data:
-                    headers_complete = True
-                    headers_end = response_data.find(b'\r\n\r\n')
-                    headers_section = response_data[:headers_end].decode('utf-8', errors='ignore')
-                    
-                    # Extrair Content-Length
-                    for line in headers_section.split('\r\n'):
-                        if line.lower().startswith('content-length:'):
-                            try:
-                                content_length = int(line.split(':', 1)[1].strip())
-                            except:
-                                pass
-                            break
+                if headers_end < 0:
+                    headers_end = buf.find(b'\r\n\r\n', search_from, n_read)
+                    if headers_end >= 0:
+                        content_length, keep_open = _parse_response_headers(buf, headers_end)
                 
                 # Se temos Content-Length, verificar se recebemos tudo
-                if content_length is not None and headers_complete:
-                    headers_end = response_data.find(b'\r\n\r\n')
-                    body_size = len(response_data) - (headers_end + 4)
-                    if body_size >= content_length:
-                        # Recebemos tudo!
-                        break
+                if content_length is not None and n_read - (headers_end + 4) >= content_length:
+                    # Recebemos tudo!
+                    break
             
-            end_time = time.time()
-            response_time = end_time - start_time
+            response_data = bytes(view[:n_read])
+        finally:
+            view.release()
+        
+        # Sem Content-Length a resposta só termina com o fechamento da conexão
+        if not keep_open or content_length is None:
+            self.close()
+        
+        return response_data if response_data else None
+
+
+class AsyncHTTPClient(SimpleHTTPClient):
+    """Versão assíncrona (asyncio) do SimpleHTTPClient, usada pelo LoadTestRunner"""
+    
+    def __init__(self, server_host: str = 'localhost', server_port: int = 80, client_id: int = 1):
+        super().__init__(server_host, server_port, client_id)
+        self._reader = None
+        self._writer = None
+    
+    async def close(self):
+        """Fecha a conexão persistente, se existir"""
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except:
+                pass
+            self._reader = None
+            self._writer = None
+    
+    async def send_request(self, method: str = 'GET', path: str = '/', body: str = '') -> Optional[Dict[str, Any]]:
+        """Envia requisição HTTP sem bloquear o event loop e retorna resultado"""
+        start_ns = time.perf_counter_ns()
+        
+        try:
+            reused = self._writer is not None
+            response_data = await asyncio.wait_for(self._exchange(method, path, body), 5.0)
             
-            # Parse da resposta
-            if response_data:
-                response_str = response_data.decode('utf-8', errors='ignore')
-                lines = response_str.split('\r\n')
-                status_line = lines[0] if lines else ""
-                
-                # Extrair status code
-                status_code = 0
-                if ' ' in status_line:
-                    parts = status_line.split()
-                    if len(parts) >= 2:
-                        try:
-                            status_code = int(parts[1])
-                        except:
-                            pass
-                
-                return {
-                    'status_code': status_code,
-                    'response_time': response_time,
-                    'success': 200 <= status_code < 400,
-                    'response_size': len(response_data),
-                    'raw_response': response_str[:200]
-                }
-            else:
-                return {
-                    'status_code': 0,
-                    'response_time': response_time,
-                    'success': False,
-                    'response_size': 0,
-                    'error': 'Empty response'
-                }
-                
-        except socket.timeout:
-            return {
-                'status_code': 0,
-                'response_time': time.time() - start_time,
-                'success': False,
-                'error': 'Timeout'
-            }
+            # Conexão reaproveitada pode ter sido fechada pelo servidor enquanto ociosa
+            if reused and response_data is None:
+                response_data = await asyncio.wait_for(self._exchange(method, path, body), 5.0)
+            
+            return self._build_result(response_data, start_ns, time.perf_counter_ns())
+        
+        except asyncio.TimeoutError:
+            await self.close()
+            return self._error_result('Timeout', start_ns)
         except Exception as e:
-            return {
-                'status_code': 0,
-                'response_time': time.time() - start_time,
-                'success': False,
-                'error': str(e)
-            }
-        finally:
-            if sock:
-                try:
-                    sock.close()
-                except:
-                    pass
+            await self.close()
+            return self._error_result(str(e), start_ns)
+    
+    async def _exchange(self, method: str, path: str, body: str) -> Optional[bytes]:
+        """
+        Envia uma requisição pela conexão persistente e lê exatamente uma resposta
+        Retorna None se a conexão foi fechada antes de qualquer byte da resposta
+        """
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.server_host, self.server_port)
+            configurar_socket(self._writer.get_extra_info('socket'))
+        
+        try:
+            self._writer.write(self._build_request(method, path, body))
+            await self._writer.drain()
+            head = await self._reader.readuntil(b'\r\n\r\n')
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            await self.close()
+            return getattr(e, 'partial', b'') or None
+        
+        content_length, keep_open = _parse_response_headers(head, len(head) - 4)
+        
+        try:
+            if content_length is None:
+                # Sem Content-Length a resposta só termina com o fechamento da conexão
+                body_data = await self._reader.read()
+                keep_open = False
+            else:
+                body_data = await self._reader.readexactly(content_length)
+        except asyncio.IncompleteReadError as e:
+            body_data = e.partial
+            keep_open = False
+        
+        if not keep_open:
+            await self.close()
+        
+        return head + body_data
 
 
 class LoadTestRunner:
     """Executor de testes de carga"""
     
-    def __init__(self, server_host: str = 'localhost', server_port: int = 80):
+    def __init__(self, server_host: str = 'localhost', server_port: int = 80, keep_requests: bool = True):
         self.server_host = server_host
         self.server_port = server_port
+        # False: métricas em histograma de memória constante (ver PerformanceMetrics)
+        self.keep_requests = keep_requests
     
     def run_scenario(self, scenario, server_type: str = "unknown") -> PerformanceMetrics:
         """
         Executa um cenário de teste específico
         
+        Os clientes do cenário rodam simultaneamente (uma corrotina asyncio por
+        cliente, cada uma com sua própria conexão), de modo que o servidor
+        concorrente é de fato exercitado com requisições paralelas.
+        
         Args:
             scenario: Objeto TestScenario
             server_type: Tipo do servidor ('sequential' ou 'concurrent')
@@ -182,53 +355,15 @@ class LoadTestRunner:
         print(f"   Requisições/cliente: {scenario.requests_per_client}")
         print(f"   Total: {scenario.total_requests} requisições")
         
-        metrics = PerformanceMetrics()
+        metrics = PerformanceMetrics(keep_requests=self.keep_requests)
         metrics.start_test()
         
-        request_id = 0
-        
-        # Criar clientes
-        clients = []
-        for i in range(scenario.num_clients):
-            client = SimpleHTTPClient(self.server_host, self.server_port, i+1)
-            clients.append(client)
-        
         try:
-            # Executar requisições para cada cliente
-            for client_idx, client in enumerate(clients):
-                print(f"   Cliente {client_idx+1}/{scenario.num_clients}: ", end="", flush=True)
-                
-                for req_idx in range(scenario.requests_per_client):
-                    # Escolher tipo de requisição baseado no cenário
-                    method, path, body = self._generate_request(scenario.request_type, req_idx)
-                    
-                    # Enviar requisição
-                    start_time = time.time()
-                    response = client.send_request(method, path, body)
-                    end_time = time.time()
-                    
-                    if response:
-                        # Registrar métrica
-                        req_metric = RequestMetrics(
-                            request_id=request_id,
-                            start_time=start_time,
-                            end_time=end_time,
-                            response_time=response['response_time'],
-                            status_code=response['status_code'],
-                            success=response['success'],
-                            server_type=server_type
-                        )
-                        metrics.add_request(req_metric)
-                        
-                        # Feedback visual
-                        if req_idx % 10 == 0 and req_idx > 0:
-                            print(f".{req_idx}", end="", flush=True)
-                    
-                    request_id += 1
-                
-                print(" ✓")
-            
+            # Cada cliente grava em seu próprio buffer de colunas (sem locks);
+            # os buffers são mesclados uma única vez em end_test()
+            asyncio.run(self._run_clients(scenario, server_type, metrics))
             metrics.end_test()
+            print(f"   Clientes concluídos: {scenario.num_clients}/{scenario.num_clients} ✓")
             
             # Calcular métricas ANTES de tentar usar
             calculated = metrics.calculate_metrics()
@@ -245,24 +380,80 @@ class LoadTestRunner:
         
         return metrics
     
+    async def _run_clients(self, scenario, server_type: str, metrics: PerformanceMetrics):
+        """Dispara todos os clientes do cenário e aguarda a conclusão de todos"""
+        progress = asyncio.create_task(self._report_progress(scenario, metrics))
+        try:
+            await asyncio.gather(*[
+                self._run_client(scenario, client_idx, server_type, metrics)
+                for client_idx in range(scenario.num_clients)
+            ])
+        finally:
+            progress.cancel()
+    
+    async def _report_progress(self, scenario, metrics: PerformanceMetrics, interval: float = 1.0):
+        """
+        Mostra o progresso uma vez por intervalo, fora do laço de requisições
+        O total concluído é lido dos próprios buffers de métricas, então o
+        caminho crítico não faz nenhuma escrita no terminal
+        """
+        while True:
+            await asyncio.sleep(interval)
+            sys.stdout.write(f"   Progresso: {metrics.recorded_count}/{scenario.total_requests}\n")
+            sys.stdout.flush()
+    
+    async def _run_client(self, scenario, client_idx: int, server_type: str, metrics: PerformanceMetrics):
+        """Executa as requisições de um único cliente sobre uma conexão persistente"""
+        client = AsyncHTTPClient(self.server_host, self.server_port, client_idx + 1)
+        record = metrics.new_buffer(server_type).record
+        generate_request = self._make_request_generator(scenario.request_type)
+        first_request_id = client_idx * scenario.requests_per_client
+        
+        try:
+            for req_idx in range(scenario.requests_per_client):
+                # Requisição do tipo do cenário (gerador escolhido uma única vez)
+                method, path, body = generate_request(req_idx)
+                
+                # Enviar requisição (o cliente já mede início, fim e latência)
+                response = await client.send_request(method, path, body)
+                
+                if response:
+                    # Registrar métrica
+                    record(first_request_id + req_idx, response['start_time_ns'], response['end_time_ns'],
+                           response['response_time_ns'], response['status_code'],
+                           response['success'])
+        finally:
+            await client.close()
+    
     def _generate_request(self, request_type: str, req_idx: int):
         """Gera uma requisição baseada no tipo"""
+        return self._make_request_generator(request_type)(req_idx)
+    
+    @staticmethod
+    def _make_request_generator(request_type: str):
+        """
+        Retorna uma função req_idx -> (method, path, body) especializada no tipo
+        O tipo é fixo durante todo o cenário, então a escolha é feita uma vez
+        e o laço de requisições só paga pela chamada
+        """
         if request_type == "fast":
-            return ('GET', '/', '')
+            request = ('GET', '/', '')
+            return lambda req_idx: request
         elif request_type == "slow":
-            return ('GET', '/status', '')
+            request = ('GET', '/status', '')
+            return lambda req_idx: request
         elif request_type == "post":
-            return ('POST', '/echo', f'Test data {req_idx}')
+            return lambda req_idx: ('POST', '/echo', f'Test data {req_idx}')
         else:  # mixed
-            if req_idx % 3 == 0:
-                return ('POST', '/echo', f'Data {req_idx}')
-            elif req_idx % 3 == 1:
-                return ('GET', '/info', '')
-            else:
-                return ('GET', '/', '')
-
+            mixed = (
+                lambda req_idx: ('POST', '/echo', f'Data {req_idx}'),
+                lambda req_idx: ('GET', '/info', ''),
+                lambda req_idx: ('GET', '/', ''),
+            )
+            return lambda req_idx: mixed[req_idx % 3](req_idx)
 
-def run_single_test(scenario_id: str, server_type: str, output_file: str = None):
+def run_single_test(scenario_id: str, server_type: str, output_file: str = None,
+                    port: Optional[int] = None):
     """
     Executa um único teste e exibe resultados
     
@@ -270,16 +461,15 @@ def run_single_test(scenario_id: str, server_type: str, output_file: str = None)
         scenario_id: ID do cenário a executar
         server_type: 'sequential' ou 'concurrent'
         output_file: Arquivo para salvar resultados (opcional)
+        port: Porta do servidor (padrão: a porta publicada do tipo de servidor)
     """
     # Determinar porta baseado no tipo de servidor
-    if server_type == 'sequential':
-        port = 80
-    elif server_type == 'concurrent':
-        port = 8080
-    else:
+    if server_type not in ('sequential', 'concurrent'):
         print(f"❌ Tipo de servidor inválido: {server_type}")
         print("   Use 'sequential' ou 'concurrent'")
         return None
+    if port is None:
+        port = 80 if server_type == 'sequential' else 8080
     
     # Buscar cenário
     test_scenarios = TestScenarios()
@@ -32,6 +32,10 @@ def calcular_ips(matricula):
 SERVER_HOST = '0.0.0.0'  # Escuta em todas as interfaces dentro do container
 SERVER_PORT = 80
 
+# Nível do log por requisição dos servidores: 'INFO' registra cada requisição,
+# 'WARNING' deixa só avisos/erros (nem chega a enfileirar as demais mensagens)
+LOG_LEVEL = 'INFO'
+
 # Configurações do cliente (para testes)
 CLIENT_HOST = 'localhost'  # Host para conectar nos testes
 CLIENT_PORT_SEQ = 80       # Porta do servidor sequencial
@@ -43,6 +47,23 @@ HASH_ALGORITHM = 'sha1'  # ou 'md5'
 # Timeout para conexões (segundos)
 CONNECTION_TIMEOUT = 30
 
+# Conexões persistentes (keep-alive): tempo ocioso máximo entre requisições
+# (segundos) e número máximo de requisições atendidas por conexão
+KEEPALIVE_TIMEOUT = 5
+KEEPALIVE_MAX_REQUESTS = 100
+
+# Tamanho dos buffers de envio/recepção dos sockets TCP (bytes)
+SOCKET_BUFFER_SIZE = 256 * 1024
+
+# Buffer de recepção reutilizado por cada thread trabalhadora (bytes); uma
+# requisição maior amplia o buffer, que só é mantido até RECV_BUFFER_MAX_SIZE
+RECV_BUFFER_SIZE = 64 * 1024
+RECV_BUFFER_MAX_SIZE = 256 * 1024
+
+# Tamanho máximo do bloco de headers de uma requisição (bytes): acima disso a
+# conexão é encerrada sem resposta
+MAX_HEADERS_SIZE = 64 * 1024
+
 # Configurações de teste
 TEST_ITERATIONS = 10  # mínimo 10 execuções por cenário
 MAX_CLIENTS = 50      # número máximo de clientes para testes de carga
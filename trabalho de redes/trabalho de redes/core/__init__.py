@@ -4,4 +4,6 @@ Módulos centrais do servidor web
 
 from .crypto_utils import *
 from .http_utils import *
+from .log_utils import *
 from .server_handlers import *
+from .socket_utils import *
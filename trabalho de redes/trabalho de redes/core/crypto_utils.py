@@ -50,6 +50,10 @@ def calcular_hash_aluno(matricula=None, nome_aluno=None, algoritmo=None):
 
     return hash_obj.hexdigest()
 
+# Matrícula e nome são constantes de config.py: o X-Custom-ID é calculado
+# uma única vez na importação em vez de refazer o hash a cada requisição
+_CACHED_CUSTOM_ID = calcular_hash_aluno()
+
 def gerar_custom_id():
     """
     Gera o valor para o cabeçalho X-Custom-ID usando o hash do aluno
@@ -57,7 +61,7 @@ def gerar_custom_id():
     Returns:
         str: Valor do X-Custom-ID
     """
-    return calcular_hash_aluno()
+    return _CACHED_CUSTOM_ID
 
 def validar_custom_id(custom_id):
     """
@@ -69,8 +73,7 @@ def validar_custom_id(custom_id):
     Returns:
         bool: True se válido, False caso contrário
     """
-    expected_id = gerar_custom_id()
-    return custom_id == expected_id
+    return custom_id == _CACHED_CUSTOM_ID
 
 # Funções auxiliares para debugging
 def print_hash_info():
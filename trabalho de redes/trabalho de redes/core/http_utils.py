@@ -5,74 +5,239 @@ Implementa parsing de requisições e construção de respostas HTTP
 """
 
 import re
-from datetime import datetime
-from .crypto_utils import validar_custom_id, gerar_custom_id
+import time
+import json
+import config
+from .crypto_utils import gerar_custom_id
+
+# orjson é opcional: serializa direto para bytes e é bem mais rápido que o
+# módulo json da biblioteca padrão, usado como alternativa
+try:
+    import orjson
+
+    def _dumps_json(data):
+        """Serializa `data` como JSON indentado em bytes UTF-8"""
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+except ImportError:
+    def _dumps_json(data):
+        """Serializa `data` como JSON indentado em bytes UTF-8"""
+        return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
+# Parser em C (httptools, binding do llhttp - sucessor do http-parser) é opcional:
+# sem ele, o parser em Python puro abaixo é utilizado
+try:
+    import httptools
+    HTTPTOOLS_AVAILABLE = True
+except ImportError:
+    HTTPTOOLS_AVAILABLE = False
+
+# Métodos aceitos pelo servidor (única definição; server_handlers a reexporta)
+SUPPORTED_METHODS = frozenset(('GET', 'POST', 'HEAD'))
+
+# X-Custom-IDs aceitos, em bytes: o valor do header é comparado como chegou,
+# sem decodificação nem chamada de função por requisição
+_VALID_CUSTOM_IDS = frozenset((gerar_custom_id().encode('ascii'),))
+
+
+def _parse_request_python(raw_request):
+    """Parser HTTP em Python puro, operando diretamente sobre bytes"""
+    method = path = version = body = None
+
+    # Separar cabeçalho e corpo em uma única operação
+    head, separator, raw_body = raw_request.partition(b'\r\n\r\n')
+    lines = head.split(b'\r\n')
+
+    # Parse da linha de requisição
+    parts = lines[0].split()
+    if len(parts) >= 3:
+        method = parts[0].decode('latin-1').upper()
+        path = parts[1].decode('utf-8', errors='ignore')
+        version = parts[2].decode('latin-1')
+
+    # Parse dos headers: bytes.partition é implementado em C
+    headers = {
+        key.strip().lower(): value.strip()
+        for key, colon, value in (line.partition(b':') for line in lines[1:])
+        if colon
+    }
+
+    # Body mantido em bytes (decodificado uma única vez por HTTPRequest)
+    if separator:
+        body = raw_body
+
+    return method, path, version, headers, body, _keep_alive_python(version, headers, body)
+
+def _keep_alive_python(version, headers, body):
+    """
+    A conexão pode continuar aberta? HTTP/1.1 é persistente salvo
+    "Connection: close"; HTTP/1.0 só com "Connection: keep-alive". Bytes
+    além do Content-Length (requisições em pipeline) fecham a conexão.
+    """
+    if body is None:
+        return False
+    connection = headers.get(b'connection', b'').lower()
+    if version == 'HTTP/1.1':
+        persistent = b'close' not in connection
+    else:
+        persistent = b'keep-alive' in connection
+    declared = headers.get(b'content-length', b'0')
+    return persistent and declared.isdigit() and len(body) == int(declared)
+
+
+class _HttpToolsCallbacks:
+    """
+    Acumula os eventos emitidos pelo httptools.HttpRequestParser
+
+    Só a primeira mensagem é considerada: se outra começar no mesmo buffer
+    (pipeline), ela é ignorada e `pipelined` impede manter a conexão aberta
+    """
+
+    __slots__ = ('url', 'headers', 'body_parts', 'headers_complete', 'complete', 'pipelined')
+
+    def __init__(self):
+        self.url = b''
+        self.headers = {}
+        self.body_parts = []
+        self.headers_complete = False
+        self.complete = False
+        self.pipelined = False
+
+    def on_message_begin(self):
+        if self.complete:
+            self.pipelined = True
+
+    def on_url(self, url):
+        if not self.complete:
+            self.url += url
+
+    def on_header(self, name, value):
+        if not self.complete:
+            self.headers[name.lower()] = value.strip()
+
+    def on_headers_complete(self):
+        self.headers_complete = True
+
+    def on_body(self, body):
+        if not self.complete:
+            self.body_parts.append(body)
+
+    def on_message_complete(self):
+        self.complete = True
+
+
+class IncrementalRequestParser:
+    """
+    Parser HTTP incremental (httptools): recebe os pedaços à medida que
+    chegam do socket, sem esperar o buffer completo nem procurar
+    Content-Length manualmente - o llhttp identifica o fim da mensagem
+    """
+
+    __slots__ = ('callbacks', 'parser', 'error')
+
+    def __init__(self):
+        self.callbacks = _HttpToolsCallbacks()
+        self.parser = httptools.HttpRequestParser(self.callbacks)
+        self.error = False
+
+    @property
+    def done(self):
+        """Mensagem completa ou requisição inválida (nada mais a receber)"""
+        return self.error or self.callbacks.complete
+
+    @property
+    def headers_complete(self):
+        """Linha de requisição e headers já recebidos por completo"""
+        return self.callbacks.headers_complete
+
+    def feed(self, data):
+        """Alimenta o parser; retorna True quando não há mais nada a receber"""
+        try:
+            self.parser.feed_data(data)
+        except httptools.HttpParserError:
+            self.error = True
+        return self.done
+
+    def result(self):
+        """Resultado no mesmo formato de parse_request"""
+        callbacks = self.callbacks
+        if self.error:
+            return None, None, None, callbacks.headers, None, False
+
+        return (
+            self.parser.get_method().decode('latin-1'),
+            callbacks.url.decode('utf-8', errors='ignore'),
+            'HTTP/' + self.parser.get_http_version(),
+            callbacks.headers,
+            b''.join(callbacks.body_parts),
+            callbacks.complete and not callbacks.pipelined and self.parser.should_keep_alive()
+        )
+
+
+def _parse_request_httptools(raw_request):
+    """Parser HTTP usando a máquina de estados em C do llhttp"""
+    parser = IncrementalRequestParser()
+    parser.feed(raw_request)
+    return parser.result()
+
+
+def parse_request(raw_request):
+    """
+    Faz o parse de uma requisição HTTP bruta
+
+    Usa o parser em C (httptools) quando disponível e o parser em Python puro
+    caso contrário; ambos produzem o mesmo formato de saída.
+
+    Returns:
+        Tupla (method, path, version, headers, body, keep_alive); headers usa
+        chaves em bytes minúsculas, body é bytes e campos ausentes/inválidos
+        são None; keep_alive indica se a conexão pode atender outra requisição
+    """
+    if HTTPTOOLS_AVAILABLE:
+        return _parse_request_httptools(raw_request)
+    return _parse_request_python(raw_request)
+
 
 class HTTPRequest:
     """Classe para representar uma requisição HTTP"""
 
-    def __init__(self, raw_request):
+    def __init__(self, raw_request: bytes, parsed=None):
+        """`parsed`: resultado já obtido durante a recepção (evita um novo parse)"""
         self.raw_request = raw_request
         self.method = None
         self.path = None
         self.version = None
-        self.headers = {}
-        self.body = None
+        self.headers = {}  # chaves e valores em bytes, chaves em minúsculas
+        self.body_bytes = None  # corpo bruto, sem decodificação
+        self._body = None  # texto do corpo, decodificado sob demanda (ver body)
+        self.keep_alive = False  # cliente aceita manter a conexão aberta
         self.valid = False
         self.custom_id_valid = False
 
-        self._parse_request()
+        self._parse_request(parsed)
 
-    def _parse_request(self):
-        """Parse da requisição HTTP bruta"""
-        try:
-            lines = self.raw_request.split('\r\n')
-
-            if not lines:
-                return
-
-            # Parse da linha de requisição
-            request_line = lines[0].strip()
-            parts = request_line.split()
-            if len(parts) >= 3:
-                self.method = parts[0].upper()
-                self.path = parts[1]
-                self.version = parts[2]
-
-            # Parse dos headers
-            header_lines = []
-            body_start = 0
-
-            for i, line in enumerate(lines[1:], 1):
-                if line.strip() == '':
-                    body_start = i + 1
-                    break
-                header_lines.append(line)
-
-            # Processar headers
-            for header_line in header_lines:
-                if ':' in header_line:
-                    key, value = header_line.split(':', 1)
-                    self.headers[key.strip().lower()] = value.strip()
-
-            # Parse do body
-            if body_start < len(lines):
-                self.body = '\r\n'.join(lines[body_start:])
-
-            # Validar requisição básica
-            self.valid = (self.method in ['GET', 'POST', 'HEAD'] and
-                         self.path and
-                         self.version)
-
-            # Validar X-Custom-ID
-            if 'x-custom-id' in self.headers:
-                self.custom_id_valid = validar_custom_id(self.headers['x-custom-id'])
-            else:
-                self.custom_id_valid = False
-
-        except Exception as e:
-            print(f"Erro ao parsear requisição: {e}")
-            self.valid = False
+    def _parse_request(self, parsed=None):
+        """Parse da requisição HTTP bruta (bytes)"""
+        if parsed is None:
+            parsed = parse_request(self.raw_request)
+        self.method, self.path, self.version, self.headers, self.body_bytes, self.keep_alive = parsed
+
+        # Validar requisição básica (path e versão só existem se a linha de
+        # requisição foi reconhecida pelo parser)
+        self.valid = self.method in SUPPORTED_METHODS and bool(self.path)
+        if not self.valid:
+            return
+
+        # Validar X-Custom-ID
+        custom_id = self.headers.get(b'x-custom-id')
+        if custom_id is not None:
+            self.custom_id_valid = custom_id in _VALID_CUSTOM_IDS
+
+    @property
+    def body(self):
+        """Corpo como texto UTF-8, decodificado só quando um handler precisa dele"""
+        if self._body is None and self.body_bytes is not None:
+            self._body = self.body_bytes.decode('utf-8', errors='ignore')
+        return self._body
 
     def is_valid(self):
         """Verifica se a requisição é válida"""
@@ -80,60 +245,261 @@ class HTTPRequest:
 
     def get_custom_id_status(self):
         """Retorna status do X-Custom-ID"""
-        if 'x-custom-id' not in self.headers:
+        if b'x-custom-id' not in self.headers:
             return "MISSING"
         elif self.custom_id_valid:
             return "VALID"
         else:
             return "INVALID"
 
+# Cache do header Date: HTTP só exige resolução de 1 segundo, então o texto é
+# reformatado apenas quando o segundo muda. A tupla é trocada de uma vez só,
+# o que mantém época e texto consistentes entre threads.
+_date_cache = (0, '')
+
+def _http_date():
+    """Retorna a data atual no formato do header HTTP Date"""
+    global _date_cache
+    now = int(time.time())
+    epoch, date_str = _date_cache
+    if now != epoch:
+        date_str = time.strftime('%a, %d %b %Y %H:%M:%S GMT', time.gmtime(now))
+        _date_cache = (now, date_str)
+    return date_str
+
+# Valor do header Connection, indexado por keep_alive; na conexão persistente
+# o header Keep-Alive acompanha, anunciando o tempo ocioso e o limite de
+# requisições aceitos pelo servidor
+_CONNECTION_VALUES = (
+    b'close',
+    b'keep-alive\r\nKeep-Alive: timeout=%d, max=%d' % (config.KEEPALIVE_TIMEOUT,
+                                                       config.KEEPALIVE_MAX_REQUESTS),
+)
+
+# Linhas de status já serializadas, por (código, mensagem)
+_STATUS_LINES = {}
+
+def _status_line(status_code, status_message):
+    """Retorna a linha de status em bytes (montada uma vez por código/mensagem)"""
+    line = _STATUS_LINES.get((status_code, status_message))
+    if line is None:
+        line = f"HTTP/1.1 {status_code} {status_message}\r\n".encode('utf-8')
+        _STATUS_LINES[(status_code, status_message)] = line
+    return line
+
+class ResponseWriter:
+    """
+    Buffer de serialização de respostas reutilizado entre requisições
+
+    Cada thread mantém o seu (ver socket_utils): a resposta é escrita por
+    atribuição de fatias em um bytearray pré-alocado, sem criar buffers
+    novos. O bytearray só cresce se uma resposta não couber, e o tamanho
+    maior é mantido para as próximas.
+    """
+
+    __slots__ = ('buffer', 'size')
+
+    def __init__(self, capacity=8192):
+        self.buffer = bytearray(capacity)
+        self.size = 0
+
+    def reset(self):
+        """Descarta o conteúdo (a memória do buffer é mantida)"""
+        self.size = 0
+
+    def write(self, data):
+        """Acrescenta bytes ao conteúdo"""
+        end = self.size + len(data)
+        self.buffer[self.size:end] = data
+        self.size = end
+
+    def getbuffer(self):
+        """Conteúdo escrito, sem cópia; válido até o próximo reset()"""
+        return memoryview(self.buffer)[:self.size]
+
 class HTTPResponse:
     """Classe para construir respostas HTTP"""
 
     def __init__(self, status_code=200, status_message="OK"):
         self.status_code = status_code
         self.status_message = status_message
+        # Headers guardados já codificados (bytes -> bytes) para que
+        # to_bytes apenas concatene, sem formatar/codificar a cada envio
         self.headers = {
-            'Server': 'Python-Web-Server/1.0',
-            'Date': datetime.utcnow().strftime('%a, %d %b %Y %H:%M:%S GMT'),
-            'Connection': 'close',
-            'Content-Type': 'text/html; charset=utf-8'
+            b'Server': b'Python-Web-Server/1.0',
+            b'Date': _http_date().encode('ascii'),
+            b'Connection': b'close',
+            b'Content-Type': b'text/html; charset=utf-8'
         }
-        self.body = ""
+        self.body = b""  # corpo sempre armazenado já codificado
 
     def set_header(self, key, value):
-        """Define um header"""
+        """Define um header (aceita str ou bytes)"""
+        if isinstance(key, str):
+            key = key.encode('latin-1')
+        if isinstance(value, str):
+            value = value.encode('latin-1')
         self.headers[key] = value
 
     def set_body(self, content, content_type='text/html; charset=utf-8'):
-        """Define o corpo da resposta"""
+        """Define o corpo da resposta (str ou bytes já codificados)"""
+        if isinstance(content, str):
+            content = content.encode('utf-8')
         self.body = content
-        self.set_header('Content-Type', content_type)
-        self.set_header('Content-Length', str(len(content.encode('utf-8'))))
+        self.set_header(b'Content-Type', content_type)
+        self.headers[b'Content-Length'] = b'%d' % len(content)
+
+    def without_body(self):
+        """Remove o corpo da resposta (usada por HEAD)"""
+        self.body = b""
+        self.headers[b'Content-Length'] = b'0'
+        return self
 
     def set_json_body(self, data):
         """Define corpo como JSON"""
-        import json
-        json_content = json.dumps(data, ensure_ascii=False, indent=2)
-        self.set_body(json_content, 'application/json; charset=utf-8')
+        self.set_body(_dumps_json(data), 'application/json; charset=utf-8')
 
-    def to_bytes(self):
-        """Converte a resposta para bytes"""
+    def _build_head(self, keep_alive=False):
+        """Linha de status + headers + linha em branco"""
         # Linha de status
-        response_lines = [f"HTTP/1.1 {self.status_code} {self.status_message}"]
+        out = bytearray(_status_line(self.status_code, self.status_message))
 
         # Headers
         for key, value in self.headers.items():
-            response_lines.append(f"{key}: {value}")
+            if key == b'Connection':
+                value = _CONNECTION_VALUES[keep_alive]
+            out += key
+            out += b': '
+            out += value
+            out += b'\r\n'
 
         # Linha em branco
-        response_lines.append("")
+        out += b'\r\n'
+        return out
 
-        # Body
+    def to_bytes(self, keep_alive=False):
+        """Converte a resposta para bytes (keep_alive: anuncia conexão persistente)"""
+        out = self._build_head(keep_alive)
         if self.body:
-            response_lines.append(self.body)
+            out += self.body
+        return bytes(out)
+
+    def to_iovec(self, keep_alive=False):
+        """Cabeçalho e corpo em buffers separados (envio scatter-gather, sem copiar o corpo)"""
+        return [bytes(self._build_head(keep_alive)), self.body]
+
+    def serialize_into(self, writer, include_body=True, keep_alive=False):
+        """
+        Escreve a resposta no ResponseWriter e retorna uma visão do resultado
+
+        A visão aponta para o buffer do writer: deve ser enviada antes que
+        ele seja reutilizado
+        """
+        writer.reset()
+        write = writer.write
+        write(_status_line(self.status_code, self.status_message))
+        for key, value in self.headers.items():
+            if key == b'Connection':
+                value = _CONNECTION_VALUES[keep_alive]
+            write(key)
+            write(b': ')
+            write(value)
+            write(b'\r\n')
+        write(b'\r\n')
+        if include_body and self.body:
+            write(self.body)
+        return writer.getbuffer()
+
+class PreparedResponse:
+    """
+    Resposta com cabeçalho pré-serializado em um template de bytes
+
+    Usada nos caminhos mais acessados do servidor: apenas Date, Connection
+    e Content-Length são preenchidos no envio, sem montar um HTTPResponse.
+    """
+
+    __slots__ = ('status_code', 'status_message', 'head_template', 'body')
+
+    def __init__(self, status_code, status_message, head_template, body=b""):
+        self.status_code = status_code
+        self.status_message = status_message
+        self.head_template = head_template
+        self.body = body
+
+    def without_body(self):
+        """Retorna a mesma resposta sem corpo (usada por HEAD)"""
+        return PreparedResponse(self.status_code, self.status_message, self.head_template)
+
+    def _head(self, keep_alive=False):
+        """Cabeçalho a partir do template"""
+        return self.head_template % (_http_date().encode('ascii'), _CONNECTION_VALUES[keep_alive],
+                                     len(self.body))
 
-        return '\r\n'.join(response_lines).encode('utf-8')
+    def to_bytes(self, keep_alive=False):
+        """Converte a resposta para bytes (keep_alive: anuncia conexão persistente)"""
+        return self._head(keep_alive) + self.body
+
+    def to_iovec(self, keep_alive=False):
+        """Cabeçalho e corpo em buffers separados (envio scatter-gather, sem copiar o corpo)"""
+        return [self._head(keep_alive), self.body]
+
+    def serialize_into(self, writer, include_body=True, keep_alive=False):
+        """
+        Mesma interface de HTTPResponse.serialize_into: o template já gera
+        o cabeçalho em uma única operação, então o writer não é usado
+        """
+        if include_body:
+            return self.to_bytes(keep_alive)
+        return self._head(keep_alive)
+
+class StaticResponse(PreparedResponse):
+    """
+    Resposta constante (erros de mensagem fixa), compartilhada entre requisições
+
+    Os bytes completos são serializados uma vez por segundo - só o header
+    Date muda - e reaproveitados nos demais envios. Sempre anuncia
+    "Connection: close": é usada só para erros, que encerram a conexão.
+    """
+
+    __slots__ = ('_cache',)
+
+    def __init__(self, status_code, status_message, head_template, body=b""):
+        super().__init__(status_code, status_message, head_template, body)
+        self._cache = ('', b"")
+
+    def _head(self, keep_alive=False):
+        """Cabeçalho a partir do template, sempre com Connection: close"""
+        return super()._head(False)
+
+    def to_bytes(self, keep_alive=False):
+        """Converte a resposta para bytes (cacheados enquanto o Date não muda)"""
+        date = _http_date()
+        cached_date, data = self._cache
+        if cached_date != date:
+            data = self.head_template % (date.encode('ascii'), _CONNECTION_VALUES[False],
+                                         len(self.body)) + self.body
+            # Tupla trocada de uma vez só: data e bytes consistentes entre threads
+            self._cache = (date, data)
+        return data
+
+    def to_iovec(self, keep_alive=False):
+        """Os bytes completos já estão em cache: um único buffer"""
+        return [self.to_bytes()]
+
+def build_head_template(status_code=200, status_message="OK", content_type='text/html; charset=utf-8'):
+    """
+    Serializa os headers fixos de uma resposta em um template de bytes
+    com marcadores para Date (%s), Connection (%s) e Content-Length (%d)
+    """
+    return (
+        f"HTTP/1.1 {status_code} {status_message}\r\n"
+        "Server: Python-Web-Server/1.0\r\n"
+        "Date: %s\r\n"
+        "Connection: %s\r\n"
+        f"Content-Type: {content_type}\r\n"
+        "Content-Length: %d\r\n"
+        "\r\n"
+    ).encode('utf-8')
 
 def create_error_response(status_code, message=None):
     """Cria uma resposta de erro padrão"""
@@ -176,6 +542,23 @@ def create_error_response(status_code, message=None):
 
     return response
 
+def prepare_error_response(status_code, message=None):
+    """
+    Pré-serializa uma resposta de erro de mensagem fixa
+
+    O corpo e os headers fixos são gerados uma única vez; a resposta
+    retornada pode ser reutilizada por todas as requisições
+    """
+    response = create_error_response(status_code, message)
+    head_template = build_head_template(response.status_code, response.status_message)
+    return StaticResponse(response.status_code, response.status_message, head_template, response.body)
+
+# Respostas de erro com mensagem fixa, compartilhadas pelos servidores
+ERRO_REQUISICAO_HTTP_INVALIDA = prepare_error_response(400, "Requisição HTTP inválida")
+ERRO_CUSTOM_ID_INVALIDO = prepare_error_response(401, "X-Custom-ID inválido ou ausente")
+ERRO_REQUISICAO_INVALIDA = prepare_error_response(400, "Requisição inválida")
+ERRO_INTERNO = prepare_error_response(500, "Erro interno do servidor")
+
 def create_success_response(content="OK", content_type='text/html; charset=utf-8'):
     """Cria uma resposta de sucesso"""
     response = HTTPResponse(200, "OK")
@@ -193,12 +576,11 @@ def validate_http_request(raw_request):
 # Teste das classes
 if __name__ == "__main__":
     # Teste de requisição
-    test_request = """GET / HTTP/1.1\r
-Host: localhost\r
-X-Custom-ID: 28eb7dd540947b6293030206534bb85faf9f7cc2\r
-User-Agent: TestClient/1.0\r
-\r
-"""
+    test_request = (b"GET / HTTP/1.1\r\n"
+                    b"Host: localhost\r\n"
+                    b"X-Custom-ID: 28eb7dd540947b6293030206534bb85faf9f7cc2\r\n"
+                    b"User-Agent: TestClient/1.0\r\n"
+                    b"\r\n")
 
     req = HTTPRequest(test_request)
     print(f"Método: {req.method}")
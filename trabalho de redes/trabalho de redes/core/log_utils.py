@@ -0,0 +1,66 @@
+"""
+Log dos servidores fora do caminho da requisição
+
+As threads que atendem requisições apenas enfileiram o registro (sem formatar
+a mensagem); a formatação e a escrita em stdout ficam com uma thread dedicada
+(QueueListener), uma por processo.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+import config
+
+_logger_raiz = logging.getLogger('servidor')
+_logger_raiz.setLevel(config.LOG_LEVEL)
+_logger_raiz.propagate = False
+
+_listener = None
+_listener_pid = None
+
+class _QueueHandlerAdiado(QueueHandler):
+    """QueueHandler que não formata: a mensagem é montada pela thread do listener"""
+
+    def prepare(self, record):
+        return record
+
+def obter_logger(nome):
+    """Retorna o logger de um servidor (filho de 'servidor')"""
+    return _logger_raiz.getChild(nome)
+
+def definir_nivel_log(nivel):
+    """Altera o nível do log (ex.: 'WARNING' em testes de carga)"""
+    _logger_raiz.setLevel(nivel)
+
+def iniciar_log():
+    """
+    Inicia a thread de escrita do log neste processo (idempotente)
+
+    Deve ser chamada também em cada processo filho: após o fork a thread
+    do processo pai não existe e a fila herdada nunca seria esvaziada
+    """
+    global _listener, _listener_pid
+    if _listener is not None and _listener_pid == os.getpid():
+        return
+
+    fila = queue.SimpleQueue()
+    saida = logging.StreamHandler(sys.stdout)
+    saida.setFormatter(logging.Formatter('%(message)s'))
+
+    _logger_raiz.handlers[:] = [_QueueHandlerAdiado(fila)]
+    _listener = QueueListener(fila, saida)
+    _listener.start()
+    _listener_pid = os.getpid()
+
+def encerrar_log():
+    """Escreve as mensagens pendentes e para a thread de log deste processo"""
+    global _listener, _listener_pid
+    if _listener is None or _listener_pid != os.getpid():
+        return
+    listener, _listener, _listener_pid = _listener, None, None
+    listener.stop()
+
+atexit.register(encerrar_log)
@@ -7,32 +7,21 @@ Define as funcionalidades de cada método HTTP suportado
 import time
 import json
 import os
-from .http_utils import HTTPResponse, create_success_response, create_error_response
+import hashlib
+from .http_utils import (HTTPResponse, PreparedResponse, SUPPORTED_METHODS, build_head_template,
+                         create_error_response, prepare_error_response)
 from .crypto_utils import gerar_custom_id
 
-class HTTPHandlers:
-    """Classe que define os handlers para as primitivas HTTP"""
-
-    def __init__(self):
-        # Estatísticas do servidor
-        self.requests_served = 0
-        self.start_time = time.time()
+# === Respostas pré-serializadas dos endpoints GET mais acessados ===
+# Headers fixos e corpos são codificados uma única vez na importação; por
+# requisição resta apenas preencher os campos dinâmicos com bytes.__mod__.
+_HTML_HEAD_TEMPLATE = build_head_template(200, "OK", 'text/html; charset=utf-8')
+_JSON_HEAD_TEMPLATE = build_head_template(200, "OK", 'application/json; charset=utf-8')
 
-    def handle_get(self, request):
-        """
-        Handler para requisições GET
-
-        Funcionalidades implementadas:
-        - GET / : Página inicial com informações do servidor
-        - GET /status : Status e estatísticas do servidor
-        - GET /info : Informações do projeto
-        - GET /time : Timestamp atual
-        """
-        self.requests_served += 1
+# Resposta 405 genérica, pré-serializada (não ecoa o método recebido)
+_ERRO_METODO_NAO_SUPORTADO = prepare_error_response(405, "Método não suportado")
 
-        if request.path == "/":
-            # Página inicial
-            html_content = """<!DOCTYPE html>
+_HOME_BODY_TEMPLATE = """<!DOCTYPE html>
 <html>
 <head>
     <title>Servidor Web Python</title>
@@ -42,8 +31,8 @@ class HTTPHandlers:
     <h1>Servidor Web Sequencial e Concorrente</h1>
     <h2>Projeto de Redes de Computadores II</h2>
     <p>Servidor implementado em Python usando sockets TCP</p>
-    <p>Requisições atendidas: {}</p>
-    <p>Tempo online: {:.2f} segundos</p>
+    <p>Requisições atendidas: %d</p>
+    <p>Tempo online: %.2f segundos</p>
     <h3>Endpoints Disponíveis:</h3>
     <ul>
         <li>GET / - Esta página</li>
@@ -54,49 +43,88 @@ class HTTPHandlers:
         <li>POST /hash - Calcula hash dos dados enviados</li>
     </ul>
 </body>
-</html>""".format(self.requests_served, time.time() - self.start_time)
+</html>""".encode('utf-8')
+
+def _json_template(data, placeholders):
+    """
+    Serializa `data` como JSON e troca os valores sentinela (strings) de
+    `placeholders` pelos marcadores de formatação correspondentes
+    """
+    text = json.dumps(data, ensure_ascii=False, indent=2).replace('%', '%%')
+    for sentinel, marker in placeholders.items():
+        text = text.replace(json.dumps(sentinel), marker)
+    return text.encode('utf-8')
+
+_STATUS_BODY_TEMPLATE = _json_template({
+    "server": "Python Web Server 1.0",
+    "status": "running",
+    "uptime": "<uptime>",
+    "requests_served": "<requests_served>",
+    "timestamp": "<timestamp>",
+    "supported_methods": ["GET", "POST", "HEAD"],
+    "endpoints": [
+        {"path": "/", "method": "GET", "description": "Página inicial"},
+        {"path": "/status", "method": "GET", "description": "Status do servidor"},
+        {"path": "/info", "method": "GET", "description": "Informações do projeto"},
+        {"path": "/time", "method": "GET", "description": "Timestamp atual"},
+        {"path": "/echo", "method": "POST", "description": "Echo do corpo"},
+        {"path": "/hash", "method": "POST", "description": "Calcula hash"}
+    ]
+}, {"<uptime>": "%a", "<requests_served>": "%d", "<timestamp>": "%a"})
+
+_INFO_BODY = json.dumps({
+    "project": "Servidor Web Sequencial e Concorrente",
+    "course": "Redes de Computadores II",
+    "technologies": ["Python", "Sockets TCP", "Docker"],
+    "features": [
+        "Servidor sequencial síncrono",
+        "Servidor concorrente com threads/multiprocess",
+        "Avaliação de performance",
+        "Métricas de latência e throughput"
+    ],
+    "x_custom_id": gerar_custom_id()
+}, ensure_ascii=False, indent=2).encode('utf-8')
+
+class HTTPHandlers:
+    """Classe que define os handlers para as primitivas HTTP"""
 
-            return create_success_response(html_content)
+    def __init__(self):
+        # Estatísticas do servidor
+        self.requests_served = 0
+        self.start_time = time.time()
+
+        # Tabela de despacho método -> handler (um lookup em dict por requisição)
+        self._dispatch = {
+            'GET': self.handle_get,
+            'POST': self.handle_post,
+            'HEAD': self.handle_head,
+        }
+
+    def handle_get(self, request):
+        """
+        Handler para requisições GET
+
+        Funcionalidades implementadas:
+        - GET / : Página inicial com informações do servidor
+        - GET /status : Status e estatísticas do servidor
+        - GET /info : Informações do projeto
+        - GET /time : Timestamp atual
+        """
+        self.requests_served += 1
+
+        if request.path == "/":
+            # Página inicial: só os dois números variam entre requisições
+            body = _HOME_BODY_TEMPLATE % (self.requests_served, time.time() - self.start_time)
+            return PreparedResponse(200, "OK", _HTML_HEAD_TEMPLATE, body)
 
         elif request.path == "/status":
             # Status detalhado em JSON
-            status_data = {
-                "server": "Python Web Server 1.0",
-                "status": "running",
-                "uptime": time.time() - self.start_time,
-                "requests_served": self.requests_served,
-                "timestamp": time.time(),
-                "supported_methods": ["GET", "POST", "HEAD"],
-                "endpoints": [
-                    {"path": "/", "method": "GET", "description": "Página inicial"},
-                    {"path": "/status", "method": "GET", "description": "Status do servidor"},
-                    {"path": "/info", "method": "GET", "description": "Informações do projeto"},
-                    {"path": "/time", "method": "GET", "description": "Timestamp atual"},
-                    {"path": "/echo", "method": "POST", "description": "Echo do corpo"},
-                    {"path": "/hash", "method": "POST", "description": "Calcula hash"}
-                ]
-            }
-            response = HTTPResponse(200, "OK")
-            response.set_json_body(status_data)
-            return response
+            body = _STATUS_BODY_TEMPLATE % (time.time() - self.start_time, self.requests_served, time.time())
+            return PreparedResponse(200, "OK", _JSON_HEAD_TEMPLATE, body)
 
         elif request.path == "/info":
-            # Informações do projeto
-            info_data = {
-                "project": "Servidor Web Sequencial e Concorrente",
-                "course": "Redes de Computadores II",
-                "technologies": ["Python", "Sockets TCP", "Docker"],
-                "features": [
-                    "Servidor sequencial síncrono",
-                    "Servidor concorrente com threads/multiprocess",
-                    "Avaliação de performance",
-                    "Métricas de latência e throughput"
-                ],
-                "x_custom_id": gerar_custom_id()
-            }
-            response = HTTPResponse(200, "OK")
-            response.set_json_body(info_data)
-            return response
+            # Informações do projeto (conteúdo constante)
+            return PreparedResponse(200, "OK", _JSON_HEAD_TEMPLATE, _INFO_BODY)
 
         elif request.path == "/time":
             # Timestamp atual
@@ -124,30 +152,32 @@ class HTTPHandlers:
         self.requests_served += 1
 
         if request.path == "/echo":
-            # Echo do corpo da requisição
-            if request.body:
+            # Echo do corpo da requisição (bytes recebidos, sem decodificar)
+            if request.body_bytes:
                 response = HTTPResponse(200, "OK")
-                response.set_body(request.body, 'text/plain; charset=utf-8')
+                response.set_body(request.body_bytes, 'text/plain; charset=utf-8')
                 return response
             else:
                 return create_error_response(400, "Corpo da requisição vazio")
 
         elif request.path == "/hash":
             # Calcula hash do corpo
-            import hashlib
-
-            if not request.body:
+            if not request.body_bytes:
                 return create_error_response(400, "Corpo da requisição necessário para calcular hash")
 
-            # Calcular MD5 e SHA-1
-            md5_hash = hashlib.md5(request.body.encode('utf-8')).hexdigest()
-            sha1_hash = hashlib.sha1(request.body.encode('utf-8')).hexdigest()
+            # Calcular MD5 e SHA-1 sobre os bytes recebidos, sem recodificar
+            # o corpo; hashes usados só como checksum (usedforsecurity=False)
+            body_bytes = request.body_bytes
+            md5_hash = hashlib.md5(body_bytes, usedforsecurity=False).hexdigest()
+            sha1_hash = hashlib.sha1(body_bytes, usedforsecurity=False).hexdigest()
 
+            # Só aqui o corpo precisa ser texto (campo "input" do JSON)
+            body_text = request.body
             hash_data = {
-                "input": request.body,
+                "input": body_text,
                 "md5": md5_hash,
                 "sha1": sha1_hash,
-                "length": len(request.body)
+                "length": len(body_text)
             }
 
             response = HTTPResponse(200, "OK")
@@ -167,54 +197,36 @@ class HTTPHandlers:
 
         # Processa como GET mas remove o body
         if request.path in ["/", "/status", "/info", "/time"]:
-            response = self.handle_get(request)
-            response.body = ""  # Remove body para HEAD
-            response.set_header('Content-Length', '0')
-            return response
+            return self.handle_get(request).without_body()
         else:
-            response = create_error_response(404, f"Path '{request.path}' não encontrado")
-            response.body = ""
-            response.set_header('Content-Length', '0')
-            return response
+            return create_error_response(404, f"Path '{request.path}' não encontrado").without_body()
 
     def process_request(self, request):
         """
         Processa uma requisição HTTP e retorna a resposta apropriada
+
+        Exceções dos handlers não são capturadas aqui: os servidores já
+        tratam qualquer erro por conexão (log + resposta 500), então o
+        caminho de despacho fica livre de blocos try/except
         """
-        try:
-            # Simular processamento (para testes de performance)
-            # time.sleep(0.001)  # 1ms de processamento simulado
-
-            if request.method == "GET":
-                return self.handle_get(request)
-            elif request.method == "POST":
-                return self.handle_post(request)
-            elif request.method == "HEAD":
-                return self.handle_head(request)
-            else:
-                return create_error_response(405, f"Método '{request.method}' não suportado")
+        # Simular processamento (para testes de performance)
+        # time.sleep(0.001)  # 1ms de processamento simulado
+
+        handler = self._dispatch.get(request.method)
+        if handler is not None:
+            return handler(request)
+        return _ERRO_METODO_NAO_SUPORTADO
 
-        except Exception as e:
-            print(f"Erro ao processar requisição: {e}")
-            return create_error_response(500, "Erro interno do servidor")
+# Instância única dos handlers, criada na importação (construção é barata)
+HANDLERS = HTTPHandlers()
 
-# Função auxiliar para obter instância do handler
-_handlers_instance = None
+# Ponto de entrada direto para o despacho, sem passar por get_handlers()
+dispatch = HANDLERS.process_request
 
 def get_handlers():
-    """Retorna instância singleton dos handlers"""
-    global _handlers_instance
-    if _handlers_instance is None:
-        _handlers_instance = HTTPHandlers()
-    return _handlers_instance
-
-# Mapeamento de métodos suportados
-SUPPORTED_METHODS = {
-    'GET': 'handle_get',
-    'POST': 'handle_post',
-    'HEAD': 'handle_head'
-}
-
-def is_method_supported(method):
-    """Verifica se um método HTTP é suportado"""
-    return method.upper() in SUPPORTED_METHODS
+    """Retorna a instância única dos handlers"""
+    return HANDLERS
+
+# Verifica se um método HTTP é suportado; o método deve vir em maiúsculas,
+# como já normalizado pelo parser de HTTPRequest
+is_method_supported = SUPPORTED_METHODS.__contains__
@@ -0,0 +1,197 @@
+"""
+Utilitários de configuração de sockets TCP
+"""
+
+import re
+import socket
+import sys
+import threading
+import config
+from .http_utils import HTTPTOOLS_AVAILABLE, IncrementalRequestParser, ResponseWriter
+
+# Fim dos headers HTTP e Content-Length ancorado no início de uma linha (no
+# \r\n que antecede o header, para não casar com sufixos de outros nomes,
+# ex.: X-Original-Content-Length); compartilhado por servidores e cliente
+_HEADERS_END = b'\r\n\r\n'
+CONTENT_LENGTH_RE = re.compile(rb'(?i)\r\ncontent-length:[ \t]*(\d+)')
+
+# Enquanto os headers não terminam, a leitura não passa deste ponto: se o fim
+# dos headers não estiver nesses bytes, eles excedem config.MAX_HEADERS_SIZE
+_LIMITE_LEITURA_HEADERS = config.MAX_HEADERS_SIZE + len(_HEADERS_END)
+
+# No Linux o socket aceito herda TCP_NODELAY e SO_SNDBUF/SO_RCVBUF do socket de
+# escuta: configurando-o uma vez, o accept dispensa 3 setsockopt por conexão
+OPCOES_HERDADAS_NO_ACCEPT = sys.platform.startswith('linux')
+
+def configurar_socket(sock):
+    """
+    Aplica as opções de desempenho a um socket TCP conectado
+
+    - TCP_NODELAY desliga o algoritmo de Nagle: requisições e respostas
+      HTTP são pequenas e o padrão pergunta/resposta sofreria atrasos de
+      até ~40ms esperando o ACK atrasado do outro lado
+    - SO_SNDBUF/SO_RCVBUF ampliados (config.SOCKET_BUFFER_SIZE) evitam que
+      a vazão fique limitada pela janela padrão do kernel
+
+    Também pode ser aplicada ao socket de escuta antes do listen (ver
+    OPCOES_HERDADAS_NO_ACCEPT)
+    """
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, config.SOCKET_BUFFER_SIZE)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, config.SOCKET_BUFFER_SIZE)
+    return sock
+
+# A partir deste tamanho de corpo, cabeçalho e corpo são enviados com
+# sendmsg (scatter-gather) em vez de concatenados em um novo buffer
+_LIMIAR_SCATTER_GATHER = 4096
+_SENDMSG_AVAILABLE = hasattr(socket.socket, 'sendmsg')
+
+# Buffers por thread trabalhadora, reaproveitados de uma requisição para a
+# outra: o bytearray de recepção (recv_into) e o ResponseWriter do envio
+_local = threading.local()
+
+def _writer_da_thread():
+    """Retorna o ResponseWriter da thread atual, criando-o no primeiro uso"""
+    writer = getattr(_local, 'writer', None)
+    if writer is None:
+        writer = _local.writer = ResponseWriter()
+    return writer
+
+def enviar_resposta(sock, response, keep_alive=False):
+    """
+    Envia uma resposta HTTP (HTTPResponse ou PreparedResponse)
+
+    keep_alive define o header Connection anunciado ao cliente.
+
+    A resposta é serializada no ResponseWriter da thread, reaproveitado
+    entre requisições (o envio é bloqueante, então o buffer está livre ao
+    retornar). Corpos grandes vão direto do buffer original para o kernel
+    via sendmsg, sem copiá-los para o writer; respostas pequenas usam um
+    único sendall, mais barato que montar a lista de buffers.
+    """
+    writer = _writer_da_thread()
+    if not _SENDMSG_AVAILABLE or len(response.body) < _LIMIAR_SCATTER_GATHER:
+        sock.sendall(response.serialize_into(writer, keep_alive=keep_alive))
+        return
+
+    head = response.serialize_into(writer, include_body=False, keep_alive=keep_alive)
+    buffers = [memoryview(head), memoryview(response.body)]
+    while buffers:
+        sent = sock.sendmsg(buffers)
+        # Descartar o que já foi enviado (envio parcial)
+        while sent:
+            size = len(buffers[0])
+            if sent >= size:
+                sent -= size
+                buffers.pop(0)
+            else:
+                buffers[0] = buffers[0][sent:]
+                sent = 0
+
+def _buffer_da_thread():
+    """Retorna o buffer de recepção da thread atual, criando-o no primeiro uso"""
+    buf = getattr(_local, 'buffer', None)
+    if buf is None:
+        buf = _local.buffer = bytearray(config.RECV_BUFFER_SIZE)
+    return buf
+
+def _ampliar_buffer(buf):
+    """
+    Requisição maior que o buffer: dobra o tamanho. Até RECV_BUFFER_MAX_SIZE
+    o novo buffer substitui o da thread; acima disso é temporário e liberado
+    ao fim da requisição, para um único corpo grande não fixar memória na thread
+    """
+    novo = bytearray(len(buf) * 2)
+    novo[:len(buf)] = buf
+    if len(novo) <= config.RECV_BUFFER_MAX_SIZE:
+        _local.buffer = novo
+    return novo
+
+def receber_requisicao(sock):
+    """
+    Recebe uma requisição HTTP completa
+
+    Retorna (bytes brutos, resultado do parse ou None). Com httptools os
+    pedaços alimentam o parser em C à medida que chegam e o parse já sai
+    pronto; sem ele (ou se a mensagem ficou incompleta), o resultado é None
+    e HTTPRequest faz o parse dos bytes.
+
+    Headers maiores que config.MAX_HEADERS_SIZE resultam em (b"", None),
+    tratado pelos servidores como requisição vazia (conexão encerrada)
+    """
+    if HTTPTOOLS_AVAILABLE:
+        return _receber_httptools(sock)
+    return _receber_bytes(sock), None
+
+def _receber_httptools(sock):
+    """Recepção com parse incremental: o fim da mensagem é detectado pelo llhttp"""
+    parser = IncrementalRequestParser()
+    buf = _buffer_da_thread()
+    view = memoryview(buf)
+    offset = 0
+
+    try:
+        while True:
+            headers_pending = not parser.headers_complete
+            if headers_pending and offset >= _LIMITE_LEITURA_HEADERS:
+                return b"", None
+            if offset == len(buf):
+                buf = _ampliar_buffer(buf)
+                view = memoryview(buf)
+            end = min(len(buf), _LIMITE_LEITURA_HEADERS) if headers_pending else len(buf)
+            received = sock.recv_into(view[offset:end])
+            if not received:
+                break
+            offset += received
+            if parser.feed(view[offset - received:offset]):
+                break
+    except socket.timeout:
+        pass
+
+    return bytes(view[:offset]), parser.result() if parser.done else None
+
+def _receber_bytes(sock):
+    """
+    Recebe uma requisição HTTP completa (headers + body via Content-Length)
+
+    Os dados são lidos com recv_into direto no buffer da thread, sem criar
+    um objeto bytes por recv; só a requisição final é copiada. A busca pelo
+    fim dos headers olha só o trecho novo mais os 3 bytes anteriores.
+    Em timeout, retorna o que já foi recebido.
+    """
+    buf = _buffer_da_thread()
+    view = memoryview(buf)
+    offset = 0
+    headers_end = -1
+
+    try:
+        # Headers
+        while headers_end == -1:
+            if offset >= _LIMITE_LEITURA_HEADERS:
+                return b""
+            if offset == len(buf):
+                buf = _ampliar_buffer(buf)
+                view = memoryview(buf)
+            received = sock.recv_into(view[offset:min(len(buf), _LIMITE_LEITURA_HEADERS)])
+            if not received:
+                return bytes(view[:offset])
+            headers_end = buf.find(_HEADERS_END, max(0, offset - 3), offset + received)
+            offset += received
+
+        # Body (se houver Content-Length)
+        match = CONTENT_LENGTH_RE.search(buf, 0, headers_end)
+        if match:
+            total = headers_end + 4 + int(match.group(1))
+            while offset < total:
+                if offset == len(buf):
+                    buf = _ampliar_buffer(buf)
+                    view = memoryview(buf)
+                received = sock.recv_into(view[offset:])
+                if not received:
+                    break
+                offset += received
+
+    except socket.timeout:
+        pass
+
+    return bytes(view[:offset])
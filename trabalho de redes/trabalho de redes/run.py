@@ -7,8 +7,11 @@ Servidores Web Sequencial e Concorrente
 import sys
 import os
 import argparse
+import socket
 import subprocess
+import threading
 import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
 # Adicionar diretório raiz ao path
@@ -16,12 +19,138 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from tests.test_scenarios import TestScenarios
 from client.test_client import run_single_test
+from core.crypto_utils import gerar_custom_id
+import config
+
+# SDK do Docker é opcional: mantém uma única conexão com o dockerd em vez de
+# um processo docker-compose por comando; sem ele, usa-se o docker-compose
+# (o diretório docker/ do projeto é importável como namespace package, por
+# isso a presença do SDK é confirmada por docker.from_env)
+try:
+    import docker
+    DOCKER_SDK_AVAILABLE = hasattr(docker, "from_env")
+except ImportError:
+    DOCKER_SDK_AVAILABLE = False
+
+# Containers (container_name do docker-compose.yml) de cada tipo de servidor
+SERVER_CONTAINERS = {
+    "sequential": ("web_server_sequential",),
+    "concurrent": ("web_server_sequential", "web_server_concurrent",
+                   "web_client_1", "web_client_2", "web_client_3"),
+}
+ALL_CONTAINERS = SERVER_CONTAINERS["concurrent"]
+
+# Porta publicada no host para cada tipo de servidor
+SERVER_PORTS = {
+    "sequential": config.CLIENT_PORT_SEQ,
+    "concurrent": config.CLIENT_PORT_CONC,
+}
+
+# Requisição de prontidão: só uma resposta HTTP prova que o servidor está de
+# pé (com Docker, o docker-proxy aceita a conexão TCP antes de o servidor
+# dentro do container escutar)
+_READY_PROBE = (f"GET /status HTTP/1.1\r\n"
+                f"Host: localhost\r\n"
+                f"X-Custom-ID: {gerar_custom_id()}\r\n"
+                f"Connection: close\r\n"
+                f"\r\n").encode()
+
+def _server_responds(host, port):
+    """Envia GET /status e verifica se a resposta começa com uma linha de status HTTP/1.1"""
+    try:
+        with socket.create_connection((host, port), timeout=0.5) as sock:
+            sock.sendall(_READY_PROBE)
+            return sock.recv(64).startswith(b"HTTP/1.1 ")
+    except OSError:
+        # Recusa, reset ou timeout: ainda não está pronto
+        return False
+
+def wait_server_ready(host, port, timeout=10.0):
+    """
+    Aguarda o servidor responder a GET /status (espera exponencial de 10ms a 200ms)
+    Retorna False se o servidor não ficar pronto dentro de `timeout` segundos
+    """
+    deadline = time.monotonic() + timeout
+    delay = 0.01
+    while time.monotonic() < deadline:
+        if _server_responds(host, port):
+            return True
+        time.sleep(delay)
+        delay = min(delay * 2, 0.2)
+    return False
+
+def _free_port(host):
+    """Porta livre (não privilegiada) escolhida pelo kernel para `host`"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+def run_command(cmd, **kwargs):
+    """
+    Executa um comando externo (check=True) sem a varredura de descritores
+
+    Com close_fds=True (padrão) o processo filho fecha todos os descritores
+    até RLIMIT_NOFILE antes do exec, o que custa caro em hosts Docker com
+    limites altos; o runner não mantém descritores sensíveis abertos, então
+    herdá-los pelos comandos docker/python é seguro
+    """
+    return subprocess.run(cmd, check=True, close_fds=False, **kwargs)
+
+def _run_scenario_iterations(scenario_id, server_type, iterations, results_dir):
+    """
+    Executa todas as iterações de um cenário (usada pelos processos da suíte paralela)
+    Retorna a lista de iterações (1-based) que falharam
+    """
+    runner = ProjectRunner()
+    failed = []
+    for i in range(iterations):
+        output_file = Path(results_dir) / f"{scenario_id}_{server_type}_iter{i+1}.json"
+        if not runner.run_test(scenario_id, server_type, str(output_file)):
+            failed.append(i + 1)
+    return failed
 
 class ProjectRunner:
     """Gerenciador de execução do projeto"""
 
     def __init__(self):
         self.project_root = Path(__file__).parent
+        self.docker_client = None
+
+        if DOCKER_SDK_AVAILABLE:
+            try:
+                self.docker_client = docker.from_env()
+            except docker.errors.DockerException:
+                self.docker_client = None
+
+    def _start_existing_containers(self, names):
+        """
+        Inicia containers já criados pelo docker-compose através do SDK
+        Retorna False se o SDK não estiver disponível ou algum container
+        ainda não existir (nesse caso o docker-compose os cria)
+        """
+        if self.docker_client is None:
+            return False
+        try:
+            containers = [self.docker_client.containers.get(name) for name in names]
+            for container in containers:
+                container.start()
+            return True
+        except docker.errors.DockerException:
+            return False
+
+    def _stop_existing_containers(self, names):
+        """Para (sem remover) os containers via SDK; False se não for possível"""
+        if self.docker_client is None:
+            return False
+        try:
+            for name in names:
+                try:
+                    self.docker_client.containers.get(name).stop()
+                except docker.errors.NotFound:
+                    pass
+            return True
+        except docker.errors.DockerException:
+            return False
 
     def setup_network(self):
         """Configura a rede Docker baseada na matrícula"""
@@ -33,7 +162,7 @@ class ProjectRunner:
             return False
 
         try:
-            subprocess.run([sys.executable, str(setup_script)], check=True)
+            run_command([sys.executable, str(setup_script)])
             return True
         except subprocess.CalledProcessError as e:
             print(f"❌ Erro na configuração da rede: {e}")
@@ -43,7 +172,7 @@ class ProjectRunner:
         """Constrói os containers Docker"""
         print("🐳 Construindo containers Docker...")
         try:
-            subprocess.run(["docker-compose", "build"], check=True, cwd=self.project_root)
+            run_command(["docker-compose", "build"], cwd=self.project_root)
             return True
         except subprocess.CalledProcessError as e:
             print(f"❌ Erro na construção dos containers: {e}")
@@ -60,13 +189,14 @@ class ProjectRunner:
             return False
 
         print(f"🚀 Iniciando servidor {server_type}...")
+        if self._start_existing_containers(SERVER_CONTAINERS[server_type]):
+            return True
+
         try:
             if service:
-                subprocess.run(["docker-compose", "up", "-d", service],
-                             check=True, cwd=self.project_root)
+                run_command(["docker-compose", "up", "-d", service], cwd=self.project_root)
             else:
-                subprocess.run(["docker-compose", "up", "-d"],
-                             check=True, cwd=self.project_root)
+                run_command(["docker-compose", "up", "-d"], cwd=self.project_root)
             return True
         except subprocess.CalledProcessError as e:
             print(f"❌ Erro ao iniciar servidor: {e}")
@@ -75,15 +205,20 @@ class ProjectRunner:
     def stop_containers(self):
         """Para todos os containers"""
         print("⏹️  Parando containers...")
+        # Com o SDK os containers são apenas parados, para serem reiniciados
+        # rapidamente no próximo start_server sem recriação
+        if self._stop_existing_containers(ALL_CONTAINERS):
+            return True
+
         try:
-            subprocess.run(["docker-compose", "down"], check=True, cwd=self.project_root)
+            run_command(["docker-compose", "down"], cwd=self.project_root)
             return True
         except subprocess.CalledProcessError as e:
             print(f"❌ Erro ao parar containers: {e}")
             return False
 
-    def run_test(self, scenario_id, server_type, output_file=None):
-        """Executa um teste específico"""
+    def run_test(self, scenario_id, server_type, output_file=None, port=None):
+        """Executa um teste específico (port: padrão é a porta publicada do servidor)"""
         print(f"🧪 Executando teste: {scenario_id} com servidor {server_type}")
 
         # Verificar se cenário existe
@@ -94,14 +229,56 @@ class ProjectRunner:
             return False
 
         try:
-            run_single_test(scenario_id, server_type, output_file)
+            run_single_test(scenario_id, server_type, output_file, port)
             return True
         except Exception as e:
             print(f"❌ Erro durante teste: {e}")
             return False
 
-    def run_full_test_suite(self, iterations=3):
-        """Executa suíte completa de testes"""
+    def run_test_in_process(self, scenario_id, server_type, output_file=None):
+        """
+        Executa um teste com o servidor rodando em uma thread deste processo
+        Dispensa Docker/docker-compose: nenhum fork, parse de YAML ou docker-proxy
+
+        O servidor usa uma porta livre escolhida pelo kernel, e não as portas
+        publicadas pelo Docker (a do sequencial, 80, exige root)
+        """
+        port = _free_port("127.0.0.1")
+        if server_type == "sequential":
+            from server.sequential_server import SequentialWebServer
+            server = SequentialWebServer(host="127.0.0.1", port=port)
+        else:
+            from server.concurrent_server import ConcurrentWebServer
+            server = ConcurrentWebServer(host="127.0.0.1", port=port)
+
+        # O log por requisição do servidor competiria com o cliente de carga
+        # pelo mesmo processo: só avisos e erros durante a medição
+        from core.log_utils import definir_nivel_log
+        definir_nivel_log('WARNING')
+
+        print(f"🚀 Iniciando servidor {server_type} no próprio processo...")
+        threading.Thread(target=server.start, daemon=True).start()
+
+        # Aguardar o servidor responder
+        if not wait_server_ready("127.0.0.1", server.port):
+            print("❌ Servidor não ficou pronto a tempo")
+            server.stop()
+            return False
+
+        try:
+            return self.run_test(scenario_id, server_type, output_file, server.port)
+        finally:
+            server.stop()
+
+    def run_full_test_suite(self, iterations=3, parallel=1):
+        """
+        Executa suíte completa de testes
+
+        Com parallel > 1 os cenários de um mesmo servidor rodam em até
+        `parallel` processos simultâneos (limitado ao número de cenários e de
+        CPUs). Isso encurta a suíte, mas os clientes passam a competir entre si
+        pelo servidor: para medições de latência limpas mantenha parallel=1
+        """
         print(f"🧪 Executando suíte completa de testes ({iterations} iterações por cenário)")
 
         scenarios = TestScenarios()
@@ -116,31 +293,68 @@ class ProjectRunner:
 
         print(f"📊 Total de testes: {total_tests}")
 
-        for scenario_id in recommended_scenarios:
-            for server_type in server_types:
-                for i in range(iterations):
-                    test_count += 1
-                    print(f"\n🔄 Teste {test_count}/{total_tests}: {scenario_id} - {server_type} (iteração {i+1})")
-
-                    # Iniciar servidor
-                    if not self.start_server(server_type):
-                        continue
-
-                    # Aguardar servidor inicializar
-                    time.sleep(2)
-
-                    # Executar teste
-                    output_file = results_dir / f"{scenario_id}_{server_type}_iter{i+1}.json"
-                    success = self.run_test(scenario_id, server_type, str(output_file))
-
-                    # Parar servidor
-                    self.stop_containers()
-
-                    if not success:
-                        print(f"⚠️  Teste {scenario_id} falhou na iteração {i+1}")
+        # Cada servidor é iniciado uma única vez e atende todos os cenários e
+        # iterações; subir/derrubar containers por teste dominava o tempo total
+        for server_type in server_types:
+            # Iniciar servidor
+            if not self.start_server(server_type):
+                test_count += len(recommended_scenarios) * iterations
+                continue
+
+            # Aguardar servidor inicializar
+            if not wait_server_ready(config.CLIENT_HOST, SERVER_PORTS[server_type]):
+                print(f"⚠️  Servidor {server_type} não respondeu; testes pulados")
+                test_count += len(recommended_scenarios) * iterations
+                self.stop_containers()
+                continue
+
+            try:
+                if parallel > 1:
+                    test_count += self._run_scenarios_parallel(
+                        recommended_scenarios, server_type, iterations, results_dir, parallel)
+                    continue
+
+                for scenario_id in recommended_scenarios:
+                    for i in range(iterations):
+                        test_count += 1
+                        print(f"\n🔄 Teste {test_count}/{total_tests}: {scenario_id} - {server_type} (iteração {i+1})")
+
+                        # Executar teste
+                        output_file = results_dir / f"{scenario_id}_{server_type}_iter{i+1}.json"
+                        success = self.run_test(scenario_id, server_type, str(output_file))
+
+                        if not success:
+                            print(f"⚠️  Teste {scenario_id} falhou na iteração {i+1}")
+            finally:
+                # Parar servidor
+                self.stop_containers()
 
         print("✅ Suíte de testes concluída!")
 
+    def _run_scenarios_parallel(self, scenario_ids, server_type, iterations, results_dir, parallel):
+        """Distribui os cenários entre processos; retorna o número de testes executados"""
+        max_workers = max(1, min(parallel, len(scenario_ids), os.cpu_count() or 1))
+        print(f"\n🔀 {server_type}: {len(scenario_ids)} cenários em {max_workers} processos")
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(_run_scenario_iterations, scenario_id, server_type,
+                                iterations, str(results_dir)): scenario_id
+                for scenario_id in scenario_ids
+            }
+            for future in as_completed(futures):
+                scenario_id = futures[future]
+                try:
+                    failed = future.result()
+                except Exception as e:
+                    print(f"⚠️  Cenário {scenario_id} abortado: {e}")
+                    continue
+                for iteration in failed:
+                    print(f"⚠️  Teste {scenario_id} falhou na iteração {iteration}")
+                print(f"✅ Cenário {scenario_id} ({server_type}) concluído")
+
+        return len(scenario_ids) * iterations
+
     def show_scenarios(self):
         """Mostra cenários disponíveis"""
         from tests.test_scenarios import print_scenarios_summary
@@ -148,13 +362,18 @@ class ProjectRunner:
 
     def clean_results(self):
         """Limpa resultados anteriores"""
-        results_dir = self.project_root / "results"
-        if results_dir.exists():
-            for file in results_dir.glob("*.json"):
-                file.unlink()
-            print("🧹 Resultados anteriores limpos!")
-        else:
+        # Uma única leitura do diretório; DirEntry já traz o caminho pronto
+        try:
+            entries = os.scandir(self.project_root / "results")
+        except FileNotFoundError:
             print("📁 Diretório de resultados não existe")
+            return
+
+        with entries:
+            for entry in entries:
+                if entry.name.endswith(".json"):
+                    os.unlink(entry.path)
+        print("🧹 Resultados anteriores limpos!")
 
 def main():
     parser = argparse.ArgumentParser(description="Servidor Web Sequencial e Concorrente")
@@ -167,6 +386,10 @@ def main():
     parser.add_argument("--iterations", type=int, default=3,
                        help="Número de iterações para suíte de testes")
     parser.add_argument("--output", help="Arquivo de saída para resultados")
+    parser.add_argument("--parallel", type=int, default=1,
+                       help="Processos simultâneos por servidor na suíte (padrão: 1, sequencial)")
+    parser.add_argument("--in-process", action="store_true",
+                       help="Executa o teste com o servidor em uma thread local, sem Docker")
 
     args = parser.parse_args()
 
@@ -193,19 +416,27 @@ def main():
             print("❌ Especifique --scenario para executar teste")
             sys.exit(1)
 
-        if runner.start_server(args.server):
-            time.sleep(2)  # Aguardar inicialização
-            success = runner.run_test(args.scenario, args.server, args.output)
+        if args.in_process:
+            success = runner.run_test_in_process(args.scenario, args.server, args.output)
+        elif runner.start_server(args.server):
+            # Aguardar inicialização
+            if wait_server_ready(config.CLIENT_HOST, SERVER_PORTS[args.server]):
+                success = runner.run_test(args.scenario, args.server, args.output)
+            else:
+                print(f"❌ Servidor {args.server} não respondeu")
+                success = False
             runner.stop_containers()
+        else:
+            return
 
-            if success:
-                print("✅ Teste executado com sucesso!")
-            else:
-                print("❌ Teste falhou!")
-                sys.exit(1)
+        if success:
+            print("✅ Teste executado com sucesso!")
+        else:
+            print("❌ Teste falhou!")
+            sys.exit(1)
 
     elif args.command == "suite":
-        runner.run_full_test_suite(args.iterations)
+        runner.run_full_test_suite(args.iterations, args.parallel)
 
     elif args.command == "scenarios":
         runner.show_scenarios()
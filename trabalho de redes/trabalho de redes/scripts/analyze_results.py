@@ -9,48 +9,54 @@ import sys
 from pathlib import Path
 from typing import Dict, List, Any
 import statistics
+from collections import defaultdict
 
 # Adiciona o diretório raiz ao path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+# Matplotlib é importado apenas em gerar_graficos: o primeiro import custa
+# cerca de 1s (varredura do cache de fontes) e não é necessário para CSV/Markdown
+
+# NumPy é opcional: agrega as séries em laços C vetorizados; sem ele,
+# o módulo statistics da biblioteca padrão é utilizado
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# orjson é opcional: parser JSON em C, bem mais rápido que o módulo json
 try:
-    import matplotlib
-    matplotlib.use('Agg')  # Backend não-interativo
-    import matplotlib.pyplot as plt
-    import matplotlib.pyplot as plt
-    MATPLOTLIB_AVAILABLE = True
+    import orjson
+    _json_loads = orjson.loads
 except ImportError:
-    MATPLOTLIB_AVAILABLE = False
-    print("⚠️  Matplotlib não disponível. Gráficos não serão gerados.")
-    print("   Instale com: pip install matplotlib")
+    _json_loads = json.loads
 
 # from tests.metrics import calcular_metricas_detalhadas  # Não usado
 
+# Prefixo do nome do arquivo -> tipo de servidor
+_PREFIXOS_SERVIDOR = {
+    'seq': 'sequential',
+    'conc': 'concurrent',
+}
 
-def carregar_resultados(results_dir: Path) -> Dict[str, Dict[str, Any]]:
-    """Carrega todos os arquivos JSON de resultados"""
+
+def carregar_resultados(json_files: List[Path]) -> Dict[str, Dict[str, Any]]:
+    """Carrega os arquivos JSON de resultados (listados uma única vez pelo chamador)"""
     resultados = {
         'sequential': {},
         'concurrent': {}
     }
     
-    for json_file in results_dir.glob('*.json'):
+    for json_file in json_files:
+        # Extrai tipo de servidor e cenário do nome do arquivo
+        prefixo, _, scenario = json_file.stem.partition('_')
+        server_type = _PREFIXOS_SERVIDOR.get(prefixo)
+        if server_type is None or not scenario:
+            continue
+        
         try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # Extrai tipo de servidor e cenário do nome do arquivo
-            filename = json_file.stem
-            if filename.startswith('seq_'):
-                server_type = 'sequential'
-                scenario = filename[4:]
-            elif filename.startswith('conc_'):
-                server_type = 'concurrent'
-                scenario = filename[5:]
-            else:
-                continue
-            
-            resultados[server_type][scenario] = data
+            resultados[server_type][scenario] = _json_loads(json_file.read_bytes())
             
         except Exception as e:
             print(f"❌ Erro ao carregar {json_file}: {e}")
@@ -58,158 +64,163 @@ def carregar_resultados(results_dir: Path) -> Dict[str, Dict[str, Any]]:
     return resultados
 
 
+def _resumir(metricas_list: List[Dict], chave: str, incluir_mediana: bool = True) -> Dict[str, float]:
+    """Média, desvio padrão amostral, mínimo, máximo (e mediana) de uma métrica"""
+    if NUMPY_AVAILABLE:
+        valores = np.fromiter((m.get(chave, 0) for m in metricas_list),
+                              dtype=np.float64, count=len(metricas_list))
+        resumo = {
+            'media': float(valores.mean()),
+            'desvio_padrao': float(valores.std(ddof=1)) if valores.size > 1 else 0,
+            'min': float(valores.min()),
+            'max': float(valores.max())
+        }
+        if incluir_mediana:
+            resumo['mediana'] = float(np.median(valores))
+        return resumo
+    
+    valores = [m.get(chave, 0) for m in metricas_list]
+    resumo = {
+        'media': statistics.mean(valores),
+        'desvio_padrao': statistics.stdev(valores) if len(valores) > 1 else 0,
+        'min': min(valores),
+        'max': max(valores)
+    }
+    if incluir_mediana:
+        resumo['mediana'] = statistics.median(valores)
+    return resumo
+
+
 def calcular_estatisticas(metricas_list: List[Dict]) -> Dict[str, Any]:
     """Calcula estatísticas agregadas de múltiplas execuções"""
     if not metricas_list:
         return {}
     
-    # Extrai valores de cada métrica
-    latencias = [m.get('latencia_media', 0) for m in metricas_list]
-    throughputs = [m.get('throughput', 0) for m in metricas_list]
-    taxas_sucesso = [m.get('taxa_sucesso', 0) for m in metricas_list]
-    
     stats = {
-        'latencia': {
-            'media': statistics.mean(latencias),
-            'desvio_padrao': statistics.stdev(latencias) if len(latencias) > 1 else 0,
-            'min': min(latencias),
-            'max': max(latencias),
-            'mediana': statistics.median(latencias)
-        },
-        'throughput': {
-            'media': statistics.mean(throughputs),
-            'desvio_padrao': statistics.stdev(throughputs) if len(throughputs) > 1 else 0,
-            'min': min(throughputs),
-            'max': max(throughputs),
-            'mediana': statistics.median(throughputs)
-        },
-        'taxa_sucesso': {
-            'media': statistics.mean(taxas_sucesso),
-            'desvio_padrao': statistics.stdev(taxas_sucesso) if len(taxas_sucesso) > 1 else 0,
-            'min': min(taxas_sucesso),
-            'max': max(taxas_sucesso)
-        },
+        'latencia': _resumir(metricas_list, 'latencia_media'),
+        'throughput': _resumir(metricas_list, 'throughput'),
+        'taxa_sucesso': _resumir(metricas_list, 'taxa_sucesso', incluir_mediana=False),
         'total_execucoes': len(metricas_list)
     }
     
     return stats
 
 
-def gerar_tabela_comparativa(resultados: Dict, output_path: Path):
-    """Gera tabela CSV com comparação entre servidores"""
-    
-    # Cabeçalho
-    linhas = [
-        "Cenário,Servidor,Latência Média (s),Desvio Padrão Latência,Throughput (req/s),Desvio Padrão Throughput,Taxa Sucesso (%),Execuções"
-    ]
-    
-    # Coleta todos os cenários únicos
-    cenarios = set(resultados['sequential'].keys()) | set(resultados['concurrent'].keys())
+# Cabeçalho da tabela comparativa
+_CABECALHO_CSV = (
+    "Cenário", "Servidor", "Latência Média (s)", "Desvio Padrão Latência",
+    "Throughput (req/s)", "Desvio Padrão Throughput", "Taxa Sucesso (%)", "Execuções"
+)
+
+# Formato de cada linha, analisado uma única vez (nomes de cenário não contêm vírgulas)
+_FMT_LINHA_CSV = "{cen},{srv},{lat:.4f},{lat_sd:.4f},{tp:.2f},{tp_sd:.2f},{ts:.2f},{n}\n"
+
+# Tipo de servidor -> nome exibido na tabela (na ordem das linhas)
+_NOMES_SERVIDOR = (('sequential', 'Sequencial'), ('concurrent', 'Concorrente'))
+
+
+def gerar_tabela_comparativa(stats_por_cenario: Dict, output_path: Path):
+    """Gera tabela CSV com comparação entre servidores (a partir das estatísticas já calculadas)"""
     
-    for cenario in sorted(cenarios):
-        # Dados do servidor sequencial
-        if cenario in resultados['sequential']:
-            data = resultados['sequential'][cenario]
-            if 'execucoes' in data:
-                stats = calcular_estatisticas(data['execucoes'])
-                linhas.append(
-                    f"{cenario},Sequencial,"
-                    f"{stats['latencia']['media']:.4f},"
-                    f"{stats['latencia']['desvio_padrao']:.4f},"
-                    f"{stats['throughput']['media']:.2f},"
-                    f"{stats['throughput']['desvio_padrao']:.2f},"
-                    f"{stats['taxa_sucesso']['media']:.2f},"
-                    f"{stats['total_execucoes']}"
-                )
+    # As linhas são escritas direto no arquivo, sem montar o CSV em memória
+    with open(output_path, 'w', encoding='utf-8', newline='') as f:
+        write = f.write
+        write(','.join(_CABECALHO_CSV) + '\n')
         
-        # Dados do servidor concorrente
-        if cenario in resultados['concurrent']:
-            data = resultados['concurrent'][cenario]
-            if 'execucoes' in data:
-                stats = calcular_estatisticas(data['execucoes'])
-                linhas.append(
-                    f"{cenario},Concorrente,"
-                    f"{stats['latencia']['media']:.4f},"
-                    f"{stats['latencia']['desvio_padrao']:.4f},"
-                    f"{stats['throughput']['media']:.2f},"
-                    f"{stats['throughput']['desvio_padrao']:.2f},"
-                    f"{stats['taxa_sucesso']['media']:.2f},"
-                    f"{stats['total_execucoes']}"
-                )
-    
-    # Salva CSV
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(linhas))
+        for cenario in sorted(stats_por_cenario):
+            stats_cenario = stats_por_cenario[cenario]
+            
+            for server_type, nome_servidor in _NOMES_SERVIDOR:
+                if server_type not in stats_cenario:
+                    continue
+                stats = stats_cenario[server_type]
+                write(_FMT_LINHA_CSV.format_map({
+                    'cen': cenario,
+                    'srv': nome_servidor,
+                    'lat': stats['latencia']['media'],
+                    'lat_sd': stats['latencia']['desvio_padrao'],
+                    'tp': stats['throughput']['media'],
+                    'tp_sd': stats['throughput']['desvio_padrao'],
+                    'ts': stats['taxa_sucesso']['media'],
+                    'n': stats['total_execucoes']
+                }))
     
     print(f"✅ Tabela comparativa salva em: {output_path}")
 
 
-def gerar_graficos(resultados: Dict, output_dir: Path):
-    """Gera gráficos comparativos"""
+def gerar_graficos(stats_por_cenario: Dict, output_dir: Path):
+    """Gera gráficos comparativos (a partir das estatísticas já calculadas)"""
+    
+    try:
+        import matplotlib
+        matplotlib.use('Agg')  # Backend não-interativo
+        import matplotlib.pyplot as plt
+        MATPLOTLIB_AVAILABLE = True
+    except ImportError:
+        MATPLOTLIB_AVAILABLE = False
     
     if not MATPLOTLIB_AVAILABLE:
         print("⚠️  Gráficos não gerados (matplotlib não disponível)")
+        print("   Instale com: pip install matplotlib")
         return
     
-    cenarios = sorted(set(resultados['sequential'].keys()) | set(resultados['concurrent'].keys()))
+    cenarios = sorted(stats_por_cenario)
     
     # Dados para gráficos
     dados_seq = {'latencia': [], 'throughput': [], 'labels': []}
     dados_conc = {'latencia': [], 'throughput': [], 'labels': []}
     
     for cenario in cenarios:
+        stats_cenario = stats_por_cenario[cenario]
+        
         # Sequencial
-        if cenario in resultados['sequential']:
-            data = resultados['sequential'][cenario]
-            if 'execucoes' in data:
-                stats = calcular_estatisticas(data['execucoes'])
-                dados_seq['latencia'].append(stats['latencia']['media'])
-                dados_seq['throughput'].append(stats['throughput']['media'])
-                dados_seq['labels'].append(cenario)
+        if 'sequential' in stats_cenario:
+            stats = stats_cenario['sequential']
+            dados_seq['latencia'].append(stats['latencia']['media'])
+            dados_seq['throughput'].append(stats['throughput']['media'])
+            dados_seq['labels'].append(cenario)
         
         # Concorrente
-        if cenario in resultados['concurrent']:
-            data = resultados['concurrent'][cenario]
-            if 'execucoes' in data:
-                stats = calcular_estatisticas(data['execucoes'])
-                dados_conc['latencia'].append(stats['latencia']['media'])
-                dados_conc['throughput'].append(stats['throughput']['media'])
-                if cenario not in dados_conc['labels']:
-                    dados_conc['labels'].append(cenario)
-    
-    # Gráfico 1: Comparação de Latência
-    plt.figure(figsize=(12, 6))
-    x = range(len(cenarios))
+        if 'concurrent' in stats_cenario:
+            stats = stats_cenario['concurrent']
+            dados_conc['latencia'].append(stats['latencia']['media'])
+            dados_conc['throughput'].append(stats['throughput']['media'])
+            dados_conc['labels'].append(cenario)
+    
+    # Uma única figura/Axes é criada e reaproveitada pelos dois gráficos:
+    # a inicialização da figura (fontes, layout) é paga apenas uma vez
+    matplotlib.rcParams['path.simplify_threshold'] = 1.0
+    fig, ax = plt.subplots(figsize=(12, 6))
+    # Posições das barras calculadas uma vez e reaproveitadas pelos dois gráficos
     width = 0.35
+    x = list(range(len(cenarios)))
+    x_left = [i - width/2 for i in x]
+    x_right = [i + width/2 for i in x]
+    
+    graficos = [
+        # (série, cores, rótulo do eixo y, título, arquivo)
+        ('latencia', ('#3498db', '#e74c3c'), 'Latência Média (segundos)',
+         'Comparação de Latência: Servidor Sequencial vs Concorrente', 'comparacao_latencia.png'),
+        ('throughput', ('#2ecc71', '#f39c12'), 'Throughput (requisições/segundo)',
+         'Comparação de Throughput: Servidor Sequencial vs Concorrente', 'comparacao_throughput.png'),
+    ]
     
-    plt.bar([i - width/2 for i in x], dados_seq['latencia'], width, label='Sequencial', color='#3498db')
-    plt.bar([i + width/2 for i in x], dados_conc['latencia'], width, label='Concorrente', color='#e74c3c')
-    
-    plt.xlabel('Cenário de Teste')
-    plt.ylabel('Latência Média (segundos)')
-    plt.title('Comparação de Latência: Servidor Sequencial vs Concorrente')
-    plt.xticks(x, cenarios, rotation=45, ha='right')
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(output_dir / 'comparacao_latencia.png', dpi=300)
-    plt.close()
-    print(f"✅ Gráfico salvo: {output_dir / 'comparacao_latencia.png'}")
-    
-    # Gráfico 2: Comparação de Throughput
-    plt.figure(figsize=(12, 6))
-    
-    plt.bar([i - width/2 for i in x], dados_seq['throughput'], width, label='Sequencial', color='#2ecc71')
-    plt.bar([i + width/2 for i in x], dados_conc['throughput'], width, label='Concorrente', color='#f39c12')
-    
-    plt.xlabel('Cenário de Teste')
-    plt.ylabel('Throughput (requisições/segundo)')
-    plt.title('Comparação de Throughput: Servidor Sequencial vs Concorrente')
-    plt.xticks(x, cenarios, rotation=45, ha='right')
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(output_dir / 'comparacao_throughput.png', dpi=300)
-    plt.close()
-    print(f"✅ Gráfico salvo: {output_dir / 'comparacao_throughput.png'}")
+    for serie, (cor_seq, cor_conc), ylabel, titulo, arquivo in graficos:
+        ax.clear()
+        ax.bar(x_left, dados_seq[serie], width, label='Sequencial', color=cor_seq)
+        ax.bar(x_right, dados_conc[serie], width, label='Concorrente', color=cor_conc)
+        
+        ax.set_xlabel('Cenário de Teste')
+        ax.set_ylabel(ylabel)
+        ax.set_title(titulo)
+        ax.set_xticks(x)
+        ax.set_xticklabels(cenarios, rotation=45, ha='right')
+        ax.legend()
+        fig.tight_layout()
+        fig.savefig(output_dir / arquivo, dpi=150)
+        print(f"✅ Gráfico salvo: {output_dir / arquivo}")
+    
+    plt.close(fig)
 
 
 def gerar_relatorio_markdown(resultados: Dict, stats_por_cenario: Dict, output_path: Path):
@@ -347,9 +358,10 @@ def main():
     
     # Carrega resultados
     print("📁 Carregando resultados...")
-    resultados = carregar_resultados(results_dir)
+    json_files = list(results_dir.glob('*.json'))
+    resultados = carregar_resultados(json_files)
     
-    total_arquivos = len(list(results_dir.glob('*.json')))
+    total_arquivos = len(json_files)
     print(f"   Encontrados {total_arquivos} arquivos de resultados")
     
     if total_arquivos == 0:
@@ -357,23 +369,23 @@ def main():
         sys.exit(1)
     
     # Calcula estatísticas por cenário
-    stats_por_cenario = {}
+    stats_por_cenario = defaultdict(dict)
     
     for server_type in ['sequential', 'concurrent']:
         for cenario, data in resultados[server_type].items():
-            if cenario not in stats_por_cenario:
-                stats_por_cenario[cenario] = {}
+            # O acesso cria a entrada do cenário mesmo sem execuções
+            stats_cenario = stats_por_cenario[cenario]
             
             if 'execucoes' in data:
-                stats_por_cenario[cenario][server_type] = calcular_estatisticas(data['execucoes'])
+                stats_cenario[server_type] = calcular_estatisticas(data['execucoes'])
     
     # Gera tabela CSV
     print("\n📋 Gerando tabela comparativa...")
-    gerar_tabela_comparativa(resultados, results_dir / 'analise_comparativa.csv')
+    gerar_tabela_comparativa(stats_por_cenario, results_dir / 'analise_comparativa.csv')
     
     # Gera gráficos
     print("\n📈 Gerando gráficos...")
-    gerar_graficos(resultados, results_dir)
+    gerar_graficos(stats_por_cenario, results_dir)
     
     # Gera relatório markdown
     print("\n📄 Gerando relatório em Markdown...")
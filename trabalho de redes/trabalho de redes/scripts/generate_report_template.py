@@ -5,6 +5,7 @@ Gera template de relatório no formato SBC (LaTeX)
 
 import sys
 from pathlib import Path
+from string import Template
 from datetime import datetime
 
 # Adiciona o diretório raiz ao path
@@ -13,9 +14,10 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from config import MATRICULA, NOME_ALUNO
 
 
-TEMPLATE_LATEX = r'''% Template de Relatório - Formato SBC
-% Aluno: ''' + NOME_ALUNO + r'''
-% Matrícula: ''' + MATRICULA + r'''
+# Texto do template com marcadores $nome/$matricula, substituídos em uma única passada
+_TEMPLATE_LATEX_BRUTO = r'''% Template de Relatório - Formato SBC
+% Aluno: $nome
+% Matrícula: $matricula
 
 \documentclass[12pt]{article}
 
@@ -31,11 +33,11 @@ TEMPLATE_LATEX = r'''% Template de Relatório - Formato SBC
 
 \title{Análise Comparativa de Servidores Web:\\Sequencial vs Concorrente}
 
-\author{''' + NOME_ALUNO + r'''}
+\author{$nome}
 
 \address{Universidade Federal do Piauí (UFPI)\\
   Disciplina: Redes de Computadores II\\
-  Matrícula: ''' + MATRICULA + r'''
+  Matrícula: $matricula
   \email{[seu-email]@[dominio].com}
 }
 
@@ -276,6 +278,8 @@ Para aplicações com baixa carga e requisições rápidas, a simplicidade do mo
 \end{document}
 '''
 
+TEMPLATE_LATEX = Template(_TEMPLATE_LATEX_BRUTO).substitute(nome=NOME_ALUNO, matricula=MATRICULA)
+
 
 README_RELATORIO = '''# 📄 Relatório SBC
 
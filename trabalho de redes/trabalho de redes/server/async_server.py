@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Servidor Web Concorrente Orientado a Eventos
+Implementa um servidor web com asyncio: cada processo executa um único event loop
+que multiplexa todas as conexões, e vários processos compartilham a mesma porta
+via SO_REUSEPORT (o kernel distribui as conexões entre eles)
+"""
+
+import asyncio
+import os
+import socket
+import sys
+import signal
+import time
+import multiprocessing
+from datetime import datetime
+
+# Importar módulos do projeto
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import config
+from core.http_utils import (HTTPRequest, ERRO_REQUISICAO_HTTP_INVALIDA, ERRO_CUSTOM_ID_INVALIDO,
+                             ERRO_REQUISICAO_INVALIDA, ERRO_INTERNO)
+from core.server_handlers import get_handlers, dispatch
+from core.socket_utils import configurar_socket, OPCOES_HERDADAS_NO_ACCEPT, CONTENT_LENGTH_RE
+from core.log_utils import obter_logger, iniciar_log, encerrar_log
+
+log = obter_logger('assincrono')
+
+# uvloop é opcional: event loop implementado em C (libuv), mais rápido que o
+# loop padrão do asyncio; sem ele, o loop da biblioteca padrão é utilizado
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+# Limite do buffer de leitura dos headers (StreamReader), o mesmo do servidor com threads
+_HEADERS_LIMIT = config.MAX_HEADERS_SIZE
+
+def _run_event_loop(coro):
+    """Executa a corrotina principal, usando uvloop quando disponível"""
+    if UVLOOP_AVAILABLE:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return asyncio.run(coro)
+
+class AsyncWebServer:
+    """Servidor web concorrente baseado em event loop (um loop por processo)"""
+
+    def __init__(self, host=config.SERVER_HOST, port=config.SERVER_PORT, workers=None):
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.running = False
+        self.handlers = get_handlers()
+        self.processes = []
+        self._loop = None
+        self._stop_event = None
+
+        # Estatísticas (por processo, sem necessidade de lock no event loop)
+        self.requests_processed = 0
+        self.errors_count = 0
+        self.active_connections = 0
+        self.start_time = None
+
+    def start(self):
+        """Inicia o servidor"""
+        try:
+            self.running = True
+            self.start_time = time.time()
+            iniciar_log()
+
+            print(f"🚀 Servidor Assíncrono iniciado em {self.host}:{self.port}")
+            print(f"📊 Processos (event loops): {self.workers}")
+            print(f"🔁 Event loop: {'uvloop' if UVLOOP_AVAILABLE else 'asyncio'}")
+            print(f"📅 Iniciado em: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+            print("⏹️  Pressione Ctrl+C para parar\n")
+
+            if self.workers > 1 and hasattr(socket, 'SO_REUSEPORT'):
+                self._run_workers()
+            else:
+                _run_event_loop(self._serve())
+
+        except Exception as e:
+            print(f"Erro ao iniciar servidor: {e}")
+            self.stop()
+            sys.exit(1)
+
+    def stop(self):
+        """Para o servidor"""
+        if not self.running:
+            return
+        self.running = False
+
+        for process in self.processes:
+            if process.is_alive():
+                process.terminate()
+        for process in self.processes:
+            process.join()
+
+        # No caminho de um único loop, main() chama stop() depois que
+        # asyncio.run() já encerrou e fechou o loop
+        loop, stop_event = self._loop, self._stop_event
+        if loop is not None and stop_event is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(stop_event.set)
+
+        encerrar_log()
+        print("✅ Servidor assíncrono encerrado")
+
+    def _run_workers(self):
+        """Cria um processo por CPU, cada um com seu próprio socket e event loop"""
+        signal.signal(signal.SIGINT, self._signal_handler)
+        signal.signal(signal.SIGTERM, self._signal_handler)
+
+        for _ in range(self.workers):
+            process = multiprocessing.Process(target=self._worker_main, daemon=True)
+            process.start()
+            self.processes.append(process)
+
+        for process in self.processes:
+            process.join()
+
+    def _signal_handler(self, signum, frame):
+        """Handler para sinais de interrupção (processo principal)"""
+        print(f"\nRecebido sinal {signum}. Encerrando servidor...")
+        self.stop()
+
+    def _worker_main(self):
+        """Ponto de entrada de cada processo trabalhador"""
+        # O processo principal é quem coordena o encerramento
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        self.processes = []
+        iniciar_log()
+        _run_event_loop(self._serve())
+
+    async def _serve(self):
+        """Abre o socket de escuta e atende conexões até o encerramento"""
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+
+        # Sinais só podem ser tratados pelo loop na thread principal
+        try:
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                self._loop.add_signal_handler(signum, self._stop_event.set)
+        except (ValueError, RuntimeError):
+            pass
+
+        try:
+            server = await asyncio.start_server(
+                self._handle_client, sock=self._create_listen_socket(),
+                limit=_HEADERS_LIMIT,
+            )
+            async with server:
+                await self._stop_event.wait()
+        finally:
+            # O loop será fechado por asyncio.run: stop() não deve mais usá-lo
+            self._loop = None
+            self._stop_event = None
+
+    def _create_listen_socket(self):
+        """
+        Cria o socket de escuta já com as opções TCP aplicadas: no Linux as
+        conexões aceitas as herdam (TCP_NODELAY, buffers) sem setsockopt extra
+        """
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, 'SO_REUSEPORT'):
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        configurar_socket(sock)
+        sock.bind((self.host, self.port))
+        sock.listen(1024)
+        sock.setblocking(False)
+        return sock
+
+    async def _handle_client(self, reader, writer):
+        """
+        Processa as requisições de um cliente (corrotina por conexão)
+
+        Com keep-alive a mesma corrotina atende as requisições seguintes da
+        conexão; uma conexão ociosa custa só a corrotina suspensa no read
+        """
+        client_address = writer.get_extra_info('peername') or ('?', 0)
+        self.active_connections += 1
+        try:
+            if not OPCOES_HERDADAS_NO_ACCEPT:
+                configurar_socket(writer.get_extra_info('socket'))
+
+            served = 0
+            while await self._handle_request(reader, writer, client_address, served):
+                served += 1
+
+        finally:
+            self.active_connections -= 1
+            # Fechar conexão do cliente
+            try:
+                writer.close()
+            except:
+                pass
+
+    async def _handle_request(self, reader, writer, client_address, served):
+        """Atende uma requisição da conexão; retorna True para manter a conexão (keep-alive)"""
+        try:
+            # Receber dados da requisição (entre requisições, o prazo é o
+            # tempo ocioso do keep-alive)
+            timeout = 5.0 if served == 0 else config.KEEPALIVE_TIMEOUT
+            request_data = await asyncio.wait_for(self._receive_request(reader), timeout)
+
+            if not request_data:
+                # Em conexão keep-alive, o cliente fechar entre requisições é normal
+                if served == 0:
+                    log.warning("❌ [%s] Requisição vazia de %s", os.getpid(), client_address[0])
+                return False
+
+            # Parse da requisição HTTP
+            request = HTTPRequest(request_data)
+
+            # Log da requisição
+            log.info("📨 [%s] %s %s - X-Custom-ID: %s", os.getpid(), request.method, request.path, request.get_custom_id_status())
+
+            # Validar requisição
+            if not request.is_valid():
+                if not request.valid:
+                    log.warning("❌ [%s] Requisição HTTP inválida de %s", os.getpid(), client_address[0])
+                    response = ERRO_REQUISICAO_HTTP_INVALIDA
+                elif not request.custom_id_valid:
+                    log.warning("❌ [%s] X-Custom-ID inválido de %s", os.getpid(), client_address[0])
+                    response = ERRO_CUSTOM_ID_INVALIDO
+                else:
+                    response = ERRO_REQUISICAO_INVALIDA
+            else:
+                # Processar requisição válida
+                response = dispatch(request)
+                self.requests_processed += 1
+                log.info("✅ [%s] Resposta: %s %s", os.getpid(), response.status_code, response.status_message)
+
+            # Manter a conexão se o cliente aceita, a resposta não é de erro
+            # e o limite de requisições por conexão não foi atingido
+            keep_alive = (request.keep_alive and response.status_code < 400 and self.running
+                          and served + 1 < config.KEEPALIVE_MAX_REQUESTS)
+
+            # Enviar resposta
+            writer.writelines(response.to_iovec(keep_alive))
+            await writer.drain()
+            return keep_alive
+
+        except asyncio.TimeoutError:
+            # Conexão keep-alive ociosa expirando não é erro
+            if served == 0:
+                log.warning("⏰ [%s] Timeout na conexão com %s", os.getpid(), client_address[0])
+        except Exception as e:
+            log.error("Erro [%s] ao processar cliente %s: %s", os.getpid(), client_address[0], e)
+            self.errors_count += 1
+            try:
+                writer.write(ERRO_INTERNO.to_bytes())
+                await writer.drain()
+            except:
+                pass
+        return False
+
+    async def _receive_request(self, reader):
+        """Recebe dados da requisição HTTP (headers + body via Content-Length)"""
+        try:
+            request_data = await reader.readuntil(b'\r\n\r\n')
+        except asyncio.IncompleteReadError as e:
+            return e.partial
+        except asyncio.LimitOverrunError:
+            return b""
+
+        match = CONTENT_LENGTH_RE.search(request_data)
+        if match:
+            content_length = int(match.group(1))
+            if content_length > 0:
+                try:
+                    request_data += await reader.readexactly(content_length)
+                except asyncio.IncompleteReadError as e:
+                    request_data += e.partial
+
+        return request_data
+
+    def get_stats(self):
+        """Retorna estatísticas do servidor (do processo atual)"""
+        uptime = time.time() - self.start_time if self.start_time else 0
+        return {
+            "server_type": "async",
+            "requests_processed": self.requests_processed,
+            "errors_count": self.errors_count,
+            "active_connections": self.active_connections,
+            "workers": self.workers,
+            "uptime": uptime,
+            "requests_per_second": self.requests_processed / uptime if uptime > 0 else 0
+        }
+
+def main(workers=None):
+    """Função principal (workers: número de processos/event loops; padrão: núcleos)"""
+    print("🌐 Servidor Web Concorrente com asyncio")
+    print("=" * 50)
+
+    server = AsyncWebServer(workers=workers)
+    try:
+        server.start()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
@@ -4,44 +4,99 @@ Servidor Web Concorrente com Threads
 Implementa um servidor web que processa múltiplas requisições simultaneamente usando threads
 """
 
+import os
+import logging
 import socket
+import selectors
 import sys
 import signal
 import time
 import threading
+import itertools
+import collections
+import multiprocessing
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor
-import queue
+
+# resource (getrusage) só existe em sistemas Unix
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
 
 # Importar módulos do projeto
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 import config
-from core.http_utils import HTTPRequest, validate_http_request, create_error_response
-from core.server_handlers import get_handlers
+from core.http_utils import (HTTPRequest, validate_http_request, ERRO_REQUISICAO_HTTP_INVALIDA,
+                             ERRO_CUSTOM_ID_INVALIDO, ERRO_REQUISICAO_INVALIDA, ERRO_INTERNO)
+from core.server_handlers import get_handlers, dispatch
+from core.socket_utils import (configurar_socket, receber_requisicao, enviar_resposta,
+                               OPCOES_HERDADAS_NO_ACCEPT)
+from core.log_utils import obter_logger, iniciar_log, encerrar_log
+
+log = obter_logger('concorrente')
+
+class _WorkerCounters:
+    """Contadores de uma única thread: só ela escreve, get_stats() apenas soma"""
+    __slots__ = ('requests', 'errors', 'accepted', 'finished')
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.accepted = 0
+        self.finished = 0
 
 class ConcurrentWebServer:
     """Servidor web concorrente que processa múltiplas requisições simultaneamente"""
 
-    def __init__(self, host=config.SERVER_HOST, port=config.SERVER_PORT, max_workers=10):
+    def __init__(self, host=config.SERVER_HOST, port=config.SERVER_PORT, max_workers=10, num_processes=1,
+                 cpu_affinity=False):
         self.host = host
         self.port = port
         self.max_workers = max_workers
+        # Com num_processes > 1 cada processo abre o próprio socket na mesma
+        # porta (SO_REUSEPORT) e o kernel distribui as conexões entre eles
+        self.num_processes = num_processes
+        self.processes = []
+        self._process_index = 0
+        # Fixa cada thread trabalhadora em um núcleo (caches mais quentes)
+        self.cpu_affinity = cpu_affinity and hasattr(os, 'sched_setaffinity')
+        self._worker_ids = itertools.count()
         self.server_socket = None
         self.running = False
         self.executor = None
         self.handlers = get_handlers()
 
-        # Estatísticas thread-safe
+        # Self-pipe: um byte escrito aqui acorda o select do loop de accept
+        self._wakeup_recv = None
+        self._wakeup_send = None
+        self._serving = False
+        self._selector = None
+
+        # Contrapressão: no máximo max_workers * 4 conexões aceitas e ainda
+        # não concluídas; acima disso o accept é suspenso e as conexões
+        # esperam no backlog do kernel, em vez de crescer a fila do pool
+        self._backpressure = threading.BoundedSemaphore(max_workers * 4)
+        self._accept_paused = False
+
+        # Conexões ociosas (recém-aceitas ou keep-alive entre requisições):
+        # em vez de prender um worker esperando a próxima requisição, ficam
+        # no selector do loop de accept e só vão ao pool quando têm dados.
+        # Os workers devolvem as keep-alive pela deque; o loop as registra e
+        # mantém em _idle (socket -> (endereço, atendidas, prazo)), em
+        # ordem de prazo, para expirá-las
+        self._idle_returns = collections.deque()
+        self._idle = {}
+
+        # Estatísticas: contadores por thread, sem lock no caminho da
+        # requisição; o lock protege só o registro de cada thread nova
         self.stats_lock = threading.Lock()
-        self.requests_processed = 0
-        self.errors_count = 0
-        self.active_connections = 0
+        self._local = threading.local()
+        self._all_counters = []
         self.start_time = None
 
-        # Fila para controlar conexões ativas
-        self.connection_queue = queue.Queue(maxsize=max_workers * 2)
-
         # Configurar signal handler para graceful shutdown
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
@@ -51,23 +106,49 @@ class ConcurrentWebServer:
         print(f"\nRecebido sinal {signum}. Encerrando servidor...")
         self.stop()
 
-    def start(self):
-        """Inicia o servidor"""
+    def _counters(self):
+        """Contadores da thread atual (registrados no primeiro uso)"""
         try:
-            # Criar socket TCP
-            self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            return self._local.counters
+        except AttributeError:
+            counters = self._local.counters = _WorkerCounters()
+            with self.stats_lock:
+                self._all_counters.append(counters)
+            return counters
+
+    def _sum_counters(self, field):
+        """Soma um contador de todas as threads (leitura rara, sem lock)"""
+        return sum(getattr(counters, field) for counters in list(self._all_counters))
+
+    @property
+    def requests_processed(self):
+        return self._sum_counters('requests')
 
-            # Bind na porta
-            self.server_socket.bind((self.host, self.port))
+    @property
+    def errors_count(self):
+        return self._sum_counters('errors')
 
-            # Listen por conexões
-            self.server_socket.listen(self.max_workers * 2)
+    @property
+    def active_connections(self):
+        # Aceitas menos concluídas: cada lado é contado por uma única thread
+        return self._sum_counters('accepted') - self._sum_counters('finished')
+
+    def start(self):
+        """Inicia o servidor"""
+        try:
             self.running = True
             self.start_time = time.time()
+            iniciar_log()
+
+            if self.num_processes > 1 and hasattr(socket, 'SO_REUSEPORT'):
+                print(f"🚀 Servidor Concorrente iniciado em {self.host}:{self.port}")
+                print(f"📊 Processos: {self.num_processes} (SO_REUSEPORT) x {self.max_workers} workers")
+                print(f"📅 Iniciado em: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+                print("⏹️  Pressione Ctrl+C para parar\n")
+                self._run_processes()
+                return
 
-            # Criar pool de threads
-            self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="Worker")
+            self._open_server_socket()
 
             print(f"🚀 Servidor Concorrente iniciado em {self.host}:{self.port}")
             print(f"📊 Workers: {self.max_workers}")
@@ -85,190 +166,436 @@ class ConcurrentWebServer:
         """Para o servidor"""
         self.running = False
 
+        # Acordar o loop de accept imediatamente
+        if self._wakeup_send:
+            try:
+                self._wakeup_send.send(b'\0')
+            except OSError:
+                pass
+
+        for process in self.processes:
+            if process.is_alive():
+                process.terminate()
+        for process in self.processes:
+            process.join()
+
         if self.executor:
             self.executor.shutdown(wait=True)
 
-        if self.server_socket:
-            self.server_socket.close()
+        # Com o loop ativo, os sockets são fechados por ele ao sair (fechar
+        # aqui descartaria o evento do self-pipe ainda não lido pelo select)
+        if not self._serving:
+            self._close_sockets()
 
+        encerrar_log()
         print("✅ Servidor concorrente encerrado")
 
+    def _close_sockets(self):
+        """Fecha o socket de escuta e o self-pipe"""
+        for sock in (self.server_socket, self._wakeup_recv, self._wakeup_send):
+            if sock:
+                sock.close()
+
+    def _open_server_socket(self):
+        """Cria o socket de escuta e o pool de threads deste processo"""
+        # Criar socket TCP
+        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        configurar_socket(self.server_socket)
+        if self.num_processes > 1 and hasattr(socket, 'SO_REUSEPORT'):
+            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+
+        # Bind na porta
+        self.server_socket.bind((self.host, self.port))
+
+        # Listen por conexões (não bloqueante: a espera fica no selector);
+        # backlog máximo, pois é ele que absorve picos com o accept suspenso
+        self.server_socket.listen(socket.SOMAXCONN)
+        self.server_socket.setblocking(False)
+        self._wakeup_recv, self._wakeup_send = socket.socketpair()
+        self._wakeup_recv.setblocking(False)
+
+        # Criar pool de threads
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="Worker",
+            initializer=self._pin_worker_thread if self.cpu_affinity else None,
+        )
+
+    def _pin_worker_thread(self):
+        """
+        Fixa a thread trabalhadora atual em um núcleo (executado uma vez por
+        thread): workers de processos diferentes recebem núcleos diferentes
+        """
+        cpus = sorted(os.sched_getaffinity(0))
+        worker_id = self._process_index * self.max_workers + next(self._worker_ids)
+        try:
+            # pid 0 = thread chamadora (no Linux a afinidade é por thread)
+            os.sched_setaffinity(0, {cpus[worker_id % len(cpus)]})
+        except OSError as e:
+            log.warning("Aviso: não foi possível fixar a thread em um núcleo: %s", e)
+
+    def _run_processes(self):
+        """Cria os processos ouvintes e aguarda seu término"""
+        for index in range(self.num_processes):
+            process = multiprocessing.Process(target=self._process_main, args=(index,), daemon=True)
+            process.start()
+            self.processes.append(process)
+
+        for process in self.processes:
+            process.join()
+
+    def _process_main(self, index):
+        """Ponto de entrada de cada processo ouvinte (estatísticas são por processo)"""
+        # O processo principal é quem coordena o encerramento
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        self.processes = []
+        self._process_index = index
+        iniciar_log()
+        self._open_server_socket()
+        self._run_server_loop()
+
     def _run_server_loop(self):
-        """Loop principal do servidor concorrente"""
-        while self.running:
+        """
+        Loop principal do servidor concorrente
+
+        O select só usa timeout quando há conexões ociosas (novas ou keep-alive) a
+        expirar; fora isso acorda apenas quando há conexão pendente, uma
+        conexão ociosa recebe dados ou alguém escreve no self-pipe
+        """
+        selector = self._selector = selectors.DefaultSelector()
+        selector.register(self.server_socket, selectors.EVENT_READ)
+        selector.register(self._wakeup_recv, selectors.EVENT_READ)
+        self._serving = True
+
+        try:
+            while self.running:
+                try:
+                    for key, _ in selector.select(1.0 if self._idle else None):
+                        if key.fileobj is self._wakeup_recv:
+                            self._wakeup_recv.recv(64)
+                            self._resume_accept()
+                            self._register_idle_connections()
+                        elif key.fileobj is self.server_socket:
+                            if self.running:
+                                self._accept_connection()
+                        else:
+                            self._resume_connection(key.fileobj)
+
+                    if self._idle:
+                        self._expire_idle_connections()
+
+                except KeyboardInterrupt:
+                    break
+                except Exception as e:
+                    if not self.running:
+                        break
+                    log.error("Erro no loop do servidor: %s", e)
+                    self._counters().errors += 1
+        finally:
+            for client_socket in list(self._idle):
+                self._close_idle(client_socket)
+            while self._idle_returns:
+                self._idle_returns.popleft()[0].close()
+            selector.close()
+            self._serving = False
+            self._close_sockets()
+
+    def _pause_accept(self):
+        """
+        Todas as vagas ocupadas: tira o socket de escuta do selector até um
+        worker terminar. Retorna False se uma vaga foi liberada nesse meio tempo
+        """
+        self._selector.unregister(self.server_socket)
+        self._accept_paused = True
+        # Um worker pode ter terminado antes de _accept_paused ser visto
+        if self._backpressure.acquire(blocking=False):
+            self._resume_accept()
+            return False
+        return True
+
+    def _resume_accept(self):
+        """Volta a monitorar o socket de escuta (executado no loop de accept)"""
+        if self._accept_paused:
+            self._accept_paused = False
+            self._selector.register(self.server_socket, selectors.EVENT_READ)
+
+    def _register_idle_connections(self):
+        """Registra no selector as conexões keep-alive devolvidas pelos workers"""
+        deadline = time.monotonic() + config.KEEPALIVE_TIMEOUT
+        while self._idle_returns:
+            client_socket, client_address, served = self._idle_returns.popleft()
+            self._add_idle(client_socket, client_address, served, deadline)
+
+    def _add_idle(self, client_socket, client_address, served, deadline):
+        """Conexão passa a esperar dados no selector (vale até `deadline`)"""
+        self._idle[client_socket] = (client_address, served, deadline)
+        self._selector.register(client_socket, selectors.EVENT_READ)
+
+    def _resume_connection(self, client_socket):
+        """Conexão ociosa recebeu dados: a próxima requisição vai para o pool"""
+        if client_socket not in self._idle:
+            return
+        client_address, served, _ = self._idle.pop(client_socket)
+        self._selector.unregister(client_socket)
+        self._submit_connection(client_socket, client_address, served)
+
+    def _close_idle(self, client_socket):
+        """Fecha uma conexão ociosa e libera sua vaga"""
+        del self._idle[client_socket]
+        self._selector.unregister(client_socket)
+        client_socket.close()
+        self._connection_done()
+
+    def _expire_idle_connections(self):
+        """Fecha as conexões ociosas (sem dados) há mais de KEEPALIVE_TIMEOUT segundos"""
+        now = time.monotonic()
+        for client_socket, (_, _, deadline) in list(self._idle.items()):
+            if deadline > now:
+                break
+            self._close_idle(client_socket)
+
+    def _accept_connection(self):
+        """Aceita uma conexão pendente e a registra no selector até ter dados"""
+        if not self._backpressure.acquire(blocking=False):
+            # Sem vagas: a keep-alive ociosa mais antiga cede a sua (só este
+            # loop adquire vagas, então a liberada não pode ser tomada); as
+            # recém-aceitas ainda esperam a primeira requisição e a mantêm
+            oldest = next((sock for sock, (_, served, _) in self._idle.items() if served), None)
+            if oldest is not None:
+                self._close_idle(oldest)
+                self._backpressure.acquire(blocking=False)
+            elif self._pause_accept():
+                return
+
+        try:
+            client_socket, client_address = self.server_socket.accept()
+        except BlockingIOError:
+            # Outro processo ouvinte (SO_REUSEPORT) já aceitou a conexão
+            self._backpressure.release()
+            return
+        except Exception:
+            self._backpressure.release()
+            raise
+
+        # Incrementar contador de conexões ativas
+        self._counters().accepted += 1
+
+        if log.isEnabledFor(logging.INFO):
+            # active_connections soma os contadores de todas as threads
+            log.info("📥 Conexão aceita de %s:%s (ativas: %s)", client_address[0], client_address[1],
+                     self.active_connections)
+
+        # Só vai ao pool quando a requisição começar a chegar: um cliente que
+        # conecta e não envia nada não prende um worker no recv (com 1 thread
+        # por processo, travaria as demais conexões). Mesmo prazo das
+        # keep-alive, o que mantém _idle em ordem de prazo
+        self._add_idle(client_socket, client_address, 0,
+                       time.monotonic() + config.KEEPALIVE_TIMEOUT)
+
+    def _submit_connection(self, client_socket, client_address, served):
+        """Entrega a próxima requisição da conexão ao pool de threads"""
+        try:
+            future = self.executor.submit(self._handle_client, client_socket, client_address, served)
+        except RuntimeError:
+            # Pool já encerrado (stop() em andamento)
+            client_socket.close()
+            self._connection_done()
+            return
+
+        # Ao terminar, a conexão volta ao selector (keep-alive) ou libera a vaga
+        future.add_done_callback(
+            lambda f: self._request_done(f, client_socket, client_address, served))
+
+    def _request_done(self, future, client_socket, client_address, served):
+        """Callback de fim de requisição (executado na thread do worker)"""
+        keep_alive = not future.cancelled() and future.exception() is None and future.result()
+        if keep_alive and self.running:
+            self._idle_returns.append((client_socket, client_address, served + 1))
             try:
-                # Aguardar conexão (não bloqueante devido ao timeout)
-                self.server_socket.settimeout(1.0)
-                client_socket, client_address = self.server_socket.accept()
+                self._wakeup_send.send(b'\0')
+            except OSError:
+                pass
+            return
 
-                # Incrementar contador de conexões ativas
-                with self.stats_lock:
-                    self.active_connections += 1
+        if keep_alive:
+            client_socket.close()
+        self._connection_done()
 
-                print(f"📥 Conexão aceita de {client_address[0]}:{client_address[1]} (ativas: {self.active_connections})")
+    def _connection_done(self):
+        """Decrementa o contador de conexões ativas e libera a vaga (thread-safe)"""
+        self._counters().finished += 1
+        self._backpressure.release()
 
-                # Submeter tarefa para o pool de threads
-                future = self.executor.submit(self._handle_client, client_socket, client_address)
+        # Acordar o loop de accept se ele estiver suspenso por falta de vagas
+        if self._accept_paused:
+            try:
+                self._wakeup_send.send(b'\0')
+            except OSError:
+                pass
 
-                # Adicionar callback para decrementar contador quando terminar
-                future.add_done_callback(lambda f: self._decrement_active_connections())
+    def _handle_client(self, client_socket, client_address, served=0):
+        """
+        Processa uma requisição de cliente (executada em thread separada)
 
-            except socket.timeout:
-                # Timeout normal, continuar loop
-                continue
-            except KeyboardInterrupt:
-                break
-            except Exception as e:
-                print(f"Erro no loop do servidor: {e}")
-                with self.stats_lock:
-                    self.errors_count += 1
-
-    def _decrement_active_connections(self):
-        """Decrementa contador de conexões ativas (thread-safe)"""
-        with self.stats_lock:
-            self.active_connections = max(0, self.active_connections - 1)
-
-    def _handle_client(self, client_socket, client_address):
-        """Processa uma requisição de cliente (executada em thread separada)"""
+        `served`: requisições já atendidas nesta conexão. Retorna True se a
+        conexão continua aberta (keep-alive); caso contrário ela é fechada aqui
+        """
+        keep_alive = False
         try:
-            # Configurar timeout para a conexão
-            client_socket.settimeout(config.CONNECTION_TIMEOUT)
+            # Opções TCP da conexão (no Linux já herdadas do socket de escuta);
+            # o timeout é definido em _receive_request
+            if served == 0 and not OPCOES_HERDADAS_NO_ACCEPT:
+                configurar_socket(client_socket)
 
             # Receber dados da requisição
-            request_data = self._receive_request(client_socket)
+            request_data, parsed = self._receive_request(client_socket)
 
             if not request_data:
-                print(f"❌ Requisição vazia de {client_address[0]} (thread: {threading.current_thread().name})")
-                return
+                # Em conexão keep-alive, o cliente fechar entre requisições é normal
+                if served == 0:
+                    log.warning("❌ Requisição vazia de %s (thread: %s)", client_address[0], threading.current_thread().name)
+                return False
 
             # Parse da requisição HTTP
-            request = HTTPRequest(request_data)
+            request = HTTPRequest(request_data, parsed)
 
             # Log da requisição
             thread_name = threading.current_thread().name
-            print(f"📨 [{thread_name}] {request.method} {request.path} - X-Custom-ID: {request.get_custom_id_status()}")
+            log.info("📨 [%s] %s %s - X-Custom-ID: %s", thread_name, request.method, request.path, request.get_custom_id_status())
 
             # Validar requisição
             if not request.is_valid():
                 if not request.valid:
-                    print(f"❌ [{thread_name}] Requisição HTTP inválida de {client_address[0]}")
-                    response = create_error_response(400, "Requisição HTTP inválida")
+                    log.warning("❌ [%s] Requisição HTTP inválida de %s", thread_name, client_address[0])
+                    response = ERRO_REQUISICAO_HTTP_INVALIDA
                 elif not request.custom_id_valid:
-                    print(f"❌ [{thread_name}] X-Custom-ID inválido de {client_address[0]}")
-                    response = create_error_response(401, "X-Custom-ID inválido ou ausente")
+                    log.warning("❌ [%s] X-Custom-ID inválido de %s", thread_name, client_address[0])
+                    response = ERRO_CUSTOM_ID_INVALIDO
                 else:
-                    response = create_error_response(400, "Requisição inválida")
+                    response = ERRO_REQUISICAO_INVALIDA
             else:
                 # Processar requisição válida
-                response = self.handlers.process_request(request)
-                with self.stats_lock:
-                    self.requests_processed += 1
-                print(f"✅ [{thread_name}] Resposta: {response.status_code} {response.status_message}")
+                response = dispatch(request)
+                self._counters().requests += 1
+                log.info("✅ [%s] Resposta: %s %s", thread_name, response.status_code, response.status_message)
+
+            # Manter a conexão se o cliente aceita, a resposta não é de erro
+            # e o limite de requisições por conexão não foi atingido
+            keep_alive = (request.keep_alive and response.status_code < 400 and self.running
+                          and served + 1 < config.KEEPALIVE_MAX_REQUESTS)
 
             # Enviar resposta
-            self._send_response(client_socket, response)
+            self._send_response(client_socket, response, keep_alive)
 
         except socket.timeout:
+            keep_alive = False
             thread_name = threading.current_thread().name
-            print(f"⏰ [{thread_name}] Timeout na conexão com {client_address[0]}")
+            log.warning("⏰ [%s] Timeout na conexão com %s", thread_name, client_address[0])
         except Exception as e:
+            keep_alive = False
             thread_name = threading.current_thread().name
-            print(f"Erro [{thread_name}] ao processar cliente {client_address[0]}: {e}")
-            with self.stats_lock:
-                self.errors_count += 1
+            log.error("Erro [%s] ao processar cliente %s: %s", thread_name, client_address[0], e)
+            self._counters().errors += 1
             try:
-                error_response = create_error_response(500, "Erro interno do servidor")
-                self._send_response(client_socket, error_response)
+                self._send_response(client_socket, ERRO_INTERNO)
             except:
                 pass
         finally:
-            # Fechar conexão do cliente
-            try:
-                client_socket.close()
-            except:
-                pass
+            # Fechar conexão do cliente (exceto keep-alive)
+            if not keep_alive:
+                try:
+                    client_socket.close()
+                except:
+                    pass
+
+        return keep_alive
 
     def _receive_request(self, client_socket):
-        """Recebe dados da requisição HTTP"""
-        request_data = b""
+        """Recebe dados da requisição HTTP (bytes brutos e, se disponível, o parse)"""
         client_socket.settimeout(5.0)  # Timeout para receber headers
 
         try:
-            while True:
-                chunk = client_socket.recv(1024)
-                if not chunk:
-                    break
-
-                request_data += chunk
-
-                # Verificar se recebemos headers completos
-                if b'\r\n\r\n' in request_data:
-                    # Verificar se há Content-Length para ler o body
-                    headers_end = request_data.find(b'\r\n\r\n')
-                    headers = request_data[:headers_end].decode('utf-8', errors='ignore')
-
-                    content_length = 0
-                    for line in headers.split('\r\n'):
-                        if line.lower().startswith('content-length:'):
-                            try:
-                                content_length = int(line.split(':')[1].strip())
-                            except:
-                                pass
-                            break
-
-                    # Se temos Content-Length, aguardar pelo body completo
-                    if content_length > 0:
-                        body_received = len(request_data) - (headers_end + 4)
-                        while body_received < content_length:
-                            chunk = client_socket.recv(1024)
-                            if not chunk:
-                                break
-                            request_data += chunk
-                            body_received += len(chunk)
-
-                    break
-
-        except socket.timeout:
-            pass
+            return receber_requisicao(client_socket)
         except Exception as e:
             thread_name = threading.current_thread().name
-            print(f"Erro [{thread_name}] ao receber dados: {e}")
+            log.error("Erro [%s] ao receber dados: %s", thread_name, e)
+            return b"", None
 
-        return request_data.decode('utf-8', errors='ignore') if request_data else ""
-
-    def _send_response(self, client_socket, response):
+    def _send_response(self, client_socket, response, keep_alive=False):
         """Envia resposta HTTP para o cliente"""
         try:
-            response_bytes = response.to_bytes()
-            client_socket.sendall(response_bytes)
+            enviar_resposta(client_socket, response, keep_alive)
         except Exception as e:
             thread_name = threading.current_thread().name
-            print(f"Erro [{thread_name}] ao enviar resposta: {e}")
+            log.error("Erro [%s] ao enviar resposta: %s", thread_name, e)
 
     def get_stats(self):
-        """Retorna estatísticas do servidor (thread-safe)"""
-        with self.stats_lock:
-            uptime = time.time() - self.start_time if self.start_time else 0
-            return {
-                "server_type": "concurrent",
-                "requests_processed": self.requests_processed,
-                "errors_count": self.errors_count,
-                "active_connections": self.active_connections,
-                "max_workers": self.max_workers,
-                "uptime": uptime,
-                "requests_per_second": self.requests_processed / uptime if uptime > 0 else 0
-            }
+        """Retorna estatísticas do servidor (soma dos contadores das threads)"""
+        uptime = time.time() - self.start_time if self.start_time else 0
+        requests_processed = self.requests_processed
+        return {
+            "server_type": "concurrent",
+            "requests_processed": requests_processed,
+            "errors_count": self.errors_count,
+            "active_connections": self.active_connections,
+            "max_workers": self.max_workers,
+            "uptime": uptime,
+            "requests_per_second": requests_processed / uptime if uptime > 0 else 0,
+            **_context_switches()
+        }
+
+def _context_switches():
+    """
+    Trocas de contexto do servidor (getrusage), incluindo processos ouvintes
+    já encerrados: as involuntárias crescem quando há mais threads que núcleos
+    """
+    if not RESOURCE_AVAILABLE:
+        return {}
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return {
+        "voluntary_context_switches": own.ru_nvcsw + children.ru_nvcsw,
+        "involuntary_context_switches": own.ru_nivcsw + children.ru_nivcsw,
+    }
 
 def main():
     """Função principal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Servidor Web Concorrente")
+    parser.add_argument("--backend", choices=["threads", "asyncio"], default="threads",
+                        help="threads: pool de threads com accept bloqueante (padrão); "
+                             "asyncio: um event loop (epoll) por processo, sem thread por conexão")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count(),
+                        help="total de threads trabalhadoras (padrão: número de núcleos; "
+                             "no mínimo 2 por processo); "
+                             "com --backend asyncio, número de processos (event loops)")
+    parser.add_argument("--no-affinity", action="store_true",
+                        help="não fixar cada thread trabalhadora em um núcleo")
+    args = parser.parse_args()
+
+    if args.backend == "asyncio":
+        from server.async_server import main as async_main
+        async_main(workers=args.workers)
+        return
+
     print("🌐 Servidor Web Concorrente com Threads")
     print("=" * 50)
 
-    # Configurar número de workers baseado na CPU
-    import multiprocessing
-    max_workers = min(multiprocessing.cpu_count() * 2, 20)  # Máximo 20 workers
+    # Uma thread por núcleo por padrão: threads além disso só disputam o GIL
+    # e aumentam as trocas de contexto
+    cpu_count = multiprocessing.cpu_count()
+
+    # Vários processos ouvintes só compensam a partir de 6 núcleos; o total
+    # de threads é dividido entre eles, com no mínimo 2 por processo: com uma
+    # só, um cliente que envia parte dos headers e para prende a thread no
+    # recv (até 5 s) e trava as demais conexões entregues àquele processo
+    num_processes = cpu_count if cpu_count >= 6 else 1
+    max_workers = max(2, args.workers // num_processes)
 
-    server = ConcurrentWebServer(max_workers=max_workers)
+    server = ConcurrentWebServer(max_workers=max_workers, num_processes=num_processes,
+                                 cpu_affinity=not args.no_affinity)
     try:
         server.start()
     except KeyboardInterrupt:
@@ -281,6 +608,9 @@ def main():
         print(f"   Erros: {stats['errors_count']}")
         print(f"   Conexões ativas: {stats['active_connections']}")
         print(f"   Workers: {stats['max_workers']}")
+        if "involuntary_context_switches" in stats:
+            print(f"   Trocas de contexto: {stats['voluntary_context_switches']} voluntárias, "
+                  f"{stats['involuntary_context_switches']} involuntárias")
         print(".2f")
         print(".2f")
 
@@ -14,8 +14,14 @@ from datetime import datetime
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 import config
-from core.http_utils import HTTPRequest, validate_http_request, create_error_response
-from core.server_handlers import get_handlers
+from core.http_utils import (HTTPRequest, validate_http_request, ERRO_REQUISICAO_HTTP_INVALIDA,
+                             ERRO_CUSTOM_ID_INVALIDO, ERRO_REQUISICAO_INVALIDA, ERRO_INTERNO)
+from core.server_handlers import get_handlers, dispatch
+from core.socket_utils import (configurar_socket, receber_requisicao, enviar_resposta,
+                               OPCOES_HERDADAS_NO_ACCEPT)
+from core.log_utils import obter_logger, iniciar_log, encerrar_log
+
+log = obter_logger('sequencial')
 
 class SequentialWebServer:
     """Servidor web sequencial que processa uma requisição por vez"""
@@ -47,6 +53,7 @@ class SequentialWebServer:
             # Criar socket TCP
             self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            configurar_socket(self.server_socket)
 
             # Bind na porta
             self.server_socket.bind((self.host, self.port))
@@ -55,6 +62,7 @@ class SequentialWebServer:
             self.server_socket.listen(5)
             self.running = True
             self.start_time = time.time()
+            iniciar_log()
 
             print(f"🚀 Servidor Sequencial iniciado em {self.host}:{self.port}")
             print(f"📊 Iniciado em: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -72,6 +80,7 @@ class SequentialWebServer:
         self.running = False
         if self.server_socket:
             self.server_socket.close()
+            encerrar_log()
             print("✅ Servidor encerrado")
 
     def _run_server_loop(self):
@@ -80,7 +89,7 @@ class SequentialWebServer:
             try:
                 # Aguardar conexão (bloqueante)
                 client_socket, client_address = self.server_socket.accept()
-                print(f"📥 Conexão aceita de {client_address[0]}:{client_address[1]}")
+                log.info("📥 Conexão aceita de %s:%s", client_address[0], client_address[1])
 
                 # Processar requisição (sequencial - uma por vez)
                 self._handle_client(client_socket, client_address)
@@ -88,55 +97,56 @@ class SequentialWebServer:
             except KeyboardInterrupt:
                 break
             except Exception as e:
-                print(f"Erro no loop do servidor: {e}")
+                log.error("Erro no loop do servidor: %s", e)
                 self.errors_count += 1
 
     def _handle_client(self, client_socket, client_address):
         """Processa uma requisição de cliente"""
         try:
-            # Configurar timeout para a conexão
-            client_socket.settimeout(config.CONNECTION_TIMEOUT)
+            # Opções TCP da conexão (no Linux já herdadas do socket de escuta);
+            # o timeout é definido em _receive_request
+            if not OPCOES_HERDADAS_NO_ACCEPT:
+                configurar_socket(client_socket)
 
             # Receber dados da requisição
-            request_data = self._receive_request(client_socket)
+            request_data, parsed = self._receive_request(client_socket)
 
             if not request_data:
-                print(f"❌ Requisição vazia de {client_address[0]}")
+                log.warning("❌ Requisição vazia de %s", client_address[0])
                 return
 
             # Parse da requisição HTTP
-            request = HTTPRequest(request_data)
+            request = HTTPRequest(request_data, parsed)
 
             # Log da requisição
-            print(f"📨 {request.method} {request.path} - X-Custom-ID: {request.get_custom_id_status()}")
+            log.info("📨 %s %s - X-Custom-ID: %s", request.method, request.path, request.get_custom_id_status())
 
             # Validar requisição
             if not request.is_valid():
                 if not request.valid:
-                    print(f"❌ Requisição HTTP inválida de {client_address[0]}")
-                    response = create_error_response(400, "Requisição HTTP inválida")
+                    log.warning("❌ Requisição HTTP inválida de %s", client_address[0])
+                    response = ERRO_REQUISICAO_HTTP_INVALIDA
                 elif not request.custom_id_valid:
-                    print(f"❌ X-Custom-ID inválido de {client_address[0]}")
-                    response = create_error_response(401, "X-Custom-ID inválido ou ausente")
+                    log.warning("❌ X-Custom-ID inválido de %s", client_address[0])
+                    response = ERRO_CUSTOM_ID_INVALIDO
                 else:
-                    response = create_error_response(400, "Requisição inválida")
+                    response = ERRO_REQUISICAO_INVALIDA
             else:
                 # Processar requisição válida
-                response = self.handlers.process_request(request)
+                response = dispatch(request)
                 self.requests_processed += 1
-                print(f"✅ Resposta: {response.status_code} {response.status_message}")
+                log.info("✅ Resposta: %s %s", response.status_code, response.status_message)
 
             # Enviar resposta
             self._send_response(client_socket, response)
 
         except socket.timeout:
-            print(f"⏰ Timeout na conexão com {client_address[0]}")
+            log.warning("⏰ Timeout na conexão com %s", client_address[0])
         except Exception as e:
-            print(f"Erro ao processar cliente {client_address[0]}: {e}")
+            log.error("Erro ao processar cliente %s: %s", client_address[0], e)
             self.errors_count += 1
             try:
-                error_response = create_error_response(500, "Erro interno do servidor")
-                self._send_response(client_socket, error_response)
+                self._send_response(client_socket, ERRO_INTERNO)
             except:
                 pass
         finally:
@@ -147,59 +157,21 @@ class SequentialWebServer:
                 pass
 
     def _receive_request(self, client_socket):
-        """Recebe dados da requisição HTTP"""
-        request_data = b""
+        """Recebe dados da requisição HTTP (bytes brutos e, se disponível, o parse)"""
         client_socket.settimeout(5.0)  # Timeout para receber headers
 
         try:
-            while True:
-                chunk = client_socket.recv(1024)
-                if not chunk:
-                    break
-
-                request_data += chunk
-
-                # Verificar se recebemos headers completos
-                if b'\r\n\r\n' in request_data:
-                    # Verificar se há Content-Length para ler o body
-                    headers_end = request_data.find(b'\r\n\r\n')
-                    headers = request_data[:headers_end].decode('utf-8', errors='ignore')
-
-                    content_length = 0
-                    for line in headers.split('\r\n'):
-                        if line.lower().startswith('content-length:'):
-                            try:
-                                content_length = int(line.split(':')[1].strip())
-                            except:
-                                pass
-                            break
-
-                    # Se temos Content-Length, aguardar pelo body completo
-                    if content_length > 0:
-                        body_received = len(request_data) - (headers_end + 4)
-                        while body_received < content_length:
-                            chunk = client_socket.recv(1024)
-                            if not chunk:
-                                break
-                            request_data += chunk
-                            body_received += len(chunk)
-
-                    break
-
-        except socket.timeout:
-            pass
+            return receber_requisicao(client_socket)
         except Exception as e:
-            print(f"Erro ao receber dados: {e}")
-
-        return request_data.decode('utf-8', errors='ignore') if request_data else ""
+            log.error("Erro ao receber dados: %s", e)
+            return b"", None
 
     def _send_response(self, client_socket, response):
         """Envia resposta HTTP para o cliente"""
         try:
-            response_bytes = response.to_bytes()
-            client_socket.sendall(response_bytes)
+            enviar_resposta(client_socket, response)
         except Exception as e:
-            print(f"Erro ao enviar resposta: {e}")
+            log.error("Erro ao enviar resposta: %s", e)
 
     def get_stats(self):
         """Retorna estatísticas do servidor"""
@@ -4,28 +4,369 @@ Métricas de Performance para Servidores Web
 Define métricas matemáticas para avaliação de desempenho dos servidores sequencial e concorrente
 """
 
+import json
+import os
 import time
 import statistics
 import math
+from array import array
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any
 from dataclasses import dataclass
 from datetime import datetime
-
-@dataclass
+from operator import itemgetter
+
+# NumPy é opcional: mediana, percentis, mínimo e máximo são obtidos sobre a
+# coluna de latências em laços C; sem ele, a coluna é ordenada em Python
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# orjson é opcional: serializa direto para bytes, bem mais rápido que o
+# módulo json da biblioteca padrão, usado como alternativa
+try:
+    import orjson
+
+    def _dumps_json(data) -> bytes:
+        """Serializa `data` como JSON indentado em bytes UTF-8"""
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+except ImportError:
+    def _dumps_json(data) -> bytes:
+        """Serializa `data` como JSON indentado em bytes UTF-8"""
+        return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+@dataclass(frozen=True)
 class RequestMetrics:
-    """Métricas de uma requisição individual"""
+    """
+    Métricas de uma requisição individual
+
+    Instantes e latência em nanossegundos inteiros (time.perf_counter_ns):
+    a subtração é exata e a conversão para segundos só ocorre na exibição
+
+    Imutável e sem __dict__ (__slots__ explícito, compatível com Python 3.9,
+    onde dataclass ainda não aceita slots=True)
+    """
+
+    __slots__ = ('request_id', 'start_time_ns', 'end_time_ns', 'response_time_ns',
+                 'status_code', 'success', 'server_type')
+
     request_id: int
-    start_time: float
-    end_time: float
-    response_time: float  # Tempo de resposta (latência)
+    start_time_ns: int
+    end_time_ns: int
+    response_time_ns: int  # Tempo de resposta (latência)
     status_code: int
     success: bool
     server_type: str  # 'sequential' ou 'concurrent'
 
+    @property
+    def response_time(self) -> float:
+        """Latência em segundos"""
+        return self.response_time_ns / 1e9
+
     @property
     def latency_ms(self) -> float:
         """Latência em milissegundos"""
-        return self.response_time * 1000
+        return self.response_time_ns / 1e6
+
+    # Sem __dict__, pickle/copy precisam do estado explícito; os campos são
+    # restaurados por object.__setattr__, já que a instância é congelada
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            object.__setattr__(self, name, value)
+
+def _desvio_padrao(n: int, total: int, squares: int) -> float:
+    """Desvio padrão amostral exato a partir de Σx e Σx²: (n·Σx² - (Σx)²) / (n·(n-1))"""
+    return math.sqrt((n * squares - total * total) / (n * (n - 1))) if n > 1 else 0
+
+class LatencyMoments:
+    """
+    Somas acumuladas das latências (todas e só as bem-sucedidas)
+
+    Atualizadas a cada requisição, dão média e desvio padrão em O(1) no fim
+    do teste. Com latências em ns inteiros as somas (inclusive a dos
+    quadrados) são exatas, sem o erro de cancelamento que o algoritmo de
+    Welford contorna em ponto flutuante, e mesclar buffers é só somar
+    """
+
+    __slots__ = ('count', 'total', 'squares', 'ok_count', 'ok_total', 'ok_squares')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.squares = 0
+        self.ok_count = 0
+        self.ok_total = 0
+        self.ok_squares = 0
+
+    def add(self, response_time_ns: int, success: bool):
+        """Acumula a latência de uma requisição"""
+        self.count += 1
+        self.total += response_time_ns
+        self.squares += response_time_ns * response_time_ns
+        if success:
+            self.ok_count += 1
+            self.ok_total += response_time_ns
+            self.ok_squares += response_time_ns * response_time_ns
+
+    def merge(self, other: 'LatencyMoments'):
+        """Soma as somas de outro acumulador (ex.: o buffer de um trabalhador)"""
+        self.count += other.count
+        self.total += other.total
+        self.squares += other.squares
+        self.ok_count += other.ok_count
+        self.ok_total += other.ok_total
+        self.ok_squares += other.ok_squares
+
+    def summary_ns(self) -> Dict[str, float]:
+        """Média e desvio padrão (todas e bem-sucedidas), em nanossegundos"""
+        return {
+            "mean": self.total / self.count if self.count else 0,
+            "std": _desvio_padrao(self.count, self.total, self.squares),
+            "service_mean": self.ok_total / self.ok_count if self.ok_count else 0,
+            "service_std": _desvio_padrao(self.ok_count, self.ok_total, self.ok_squares),
+        }
+
+class MetricsBuffer:
+    """
+    Colunas de métricas exclusivas de um trabalhador (cliente, thread ou corrotina)
+
+    Cada trabalhador grava apenas no seu buffer, sem locks; os buffers são
+    mesclados no PerformanceMetrics uma única vez, em end_test()
+    """
+
+    __slots__ = ('request_ids', 'start_times_ns', 'end_times_ns',
+                 'response_times_ns', 'status_codes', 'successes', 'moments')
+
+    def __init__(self):
+        self.request_ids = array('q')
+        self.start_times_ns = array('q')
+        self.end_times_ns = array('q')
+        self.response_times_ns = array('q')
+        self.status_codes = array('h')
+        self.successes = array('b')
+        self.moments = LatencyMoments()
+
+    def __len__(self):
+        return len(self.response_times_ns)
+
+    def record(self, request_id: int, start_time_ns: int, end_time_ns: int,
+               response_time_ns: int, status_code: int, success: bool):
+        """Registra uma requisição no buffer do trabalhador (tempos em ns)"""
+        self.request_ids.append(request_id)
+        self.start_times_ns.append(start_time_ns)
+        self.end_times_ns.append(end_time_ns)
+        self.response_times_ns.append(response_time_ns)
+        self.status_codes.append(status_code)
+        self.successes.append(success)
+        self.moments.add(response_time_ns, success)
+
+# Percentis calculados, como frações i/partes: mediana, p95 e p99
+_PERCENTIS = ((1, 2), (19, 20), (99, 100))
+
+# Tamanho mínimo das colunas para compare_with calcular os dois lados em threads
+_MIN_PARALLEL_COMPARE = 200_000
+
+# Resolução do histograma: buckets por potência de 2 (erro relativo < 1,1%)
+_BUCKETS_POR_OITAVA = 64
+
+class LatencyHistogram(LatencyMoments):
+    """
+    Histograma logarítmico das latências, de memória constante
+
+    Alternativa às colunas quando não é preciso guardar cada requisição:
+    média e desvio padrão continuam exatos (somas inteiras em ns) e os
+    percentis são estimados pelo histograma. Tem o mesmo record() do
+    MetricsBuffer, então também serve como buffer de um trabalhador
+    """
+
+    __slots__ = ('buckets', 'minimum', 'maximum')
+
+    def __init__(self):
+        super().__init__()
+        self.buckets = Counter()
+        self.minimum = None
+        self.maximum = None
+
+    def __len__(self):
+        return self.count
+
+    def record(self, request_id: int, start_time_ns: int, end_time_ns: int,
+               response_time_ns: int, status_code: int, success: bool):
+        """Acumula uma requisição (só a latência e o sucesso são mantidos)"""
+        self.buckets[int(math.log2(response_time_ns) * _BUCKETS_POR_OITAVA)
+                     if response_time_ns > 1 else 0] += 1
+        self.add(response_time_ns, success)
+        if self.minimum is None or response_time_ns < self.minimum:
+            self.minimum = response_time_ns
+        if self.maximum is None or response_time_ns > self.maximum:
+            self.maximum = response_time_ns
+
+    def merge(self, other: 'LatencyHistogram'):
+        """Soma outro histograma (ex.: o buffer de um trabalhador) a este"""
+        if not other.count:
+            return
+        super().merge(other)
+        self.buckets.update(other.buckets)
+        self.minimum = other.minimum if self.minimum is None else min(self.minimum, other.minimum)
+        self.maximum = other.maximum if self.maximum is None else max(self.maximum, other.maximum)
+
+    def _percentis(self) -> List[float]:
+        """
+        Mediana, p95 e p99 pela CDF do histograma, interpolando em escala
+        logarítmica dentro do bucket e limitando ao mínimo e máximo observados
+        """
+        ordenados = sorted(self.buckets.items())
+        resultado = []
+        for i, partes in _PERCENTIS:
+            # Posição (1..n) do método exclusivo, o mesmo das colunas
+            posicao = min(max(i * (self.count + 1) / partes, 1), self.count)
+            acumulado = 0
+            for bucket, quantidade in ordenados:
+                if acumulado + quantidade >= posicao:
+                    fracao = (posicao - acumulado) / quantidade
+                    valor = 2 ** ((bucket + fracao) / _BUCKETS_POR_OITAVA)
+                    resultado.append(min(max(valor, self.minimum), self.maximum))
+                    break
+                acumulado += quantidade
+        return resultado
+
+    def summary_ns(self) -> Dict[str, float]:
+        """Mesmas estatísticas de _latency_summary_ns, a partir das somas e do histograma"""
+        n = self.count
+        median, p95, p99 = self._percentis()
+        summary = super().summary_ns()
+        summary.update({
+            "median": median,
+            "min": self.minimum,
+            "max": self.maximum,
+            "p95": p95 if n >= 20 else self.maximum,
+            "p99": p99 if n >= 100 else self.maximum,
+        })
+        return summary
+
+def _posicoes_percentil(n: int, i: int, partes: int) -> tuple:
+    """
+    Posições vizinhas e peso da interpolação do percentil i/partes entre n
+    valores ordenados, pelo método exclusivo de statistics.quantiles (n >= 2)
+    """
+    j = min(max(i * (n + 1) // partes, 1), n - 1)
+    return j - 1, j, i * (n + 1) - j * partes
+
+def _percentis(ordenados, n: int) -> List[float]:
+    """
+    Mediana, p95 e p99; basta que os valores estejam na ordem final nas
+    posições dadas por _posicoes_percentil (lista ordenada ou np.partition)
+    """
+    if n == 1:
+        return [float(ordenados[0])] * len(_PERCENTIS)
+    resultado = []
+    for i, partes in _PERCENTIS:
+        baixo, alto, delta = _posicoes_percentil(n, i, partes)
+        resultado.append((ordenados[baixo] * (partes - delta) + ordenados[alto] * delta) / partes)
+    return resultado
+
+def _selecionar(values, kth: List[int]):
+    """
+    Cópia de values com os valores das posições kth (crescentes) na ordem final
+
+    Seleção em O(n) em vez de ordenar: a primeira np.partition cobre o array
+    todo e cada seguinte só a parte à direita da posição anterior (in-place);
+    os percentis altos ficam numa fração pequena do array
+    """
+    work = np.partition(values, kth[0])
+    previous = kth[0]
+    for k in kth[1:]:
+        work[previous + 1:].partition(k - previous - 1)
+        previous = k
+    return work
+
+def _latency_summary(latencies_ns: array, moments: LatencyMoments) -> Dict[str, float]:
+    """
+    Estatísticas das latências (todas e só as bem-sucedidas), em segundos
+
+    Média e desvio padrão vêm das somas acumuladas; mediana, mínimo, máximo
+    e percentis, das latências. Percentis seguem statistics.quantiles
+    (método exclusivo); com poucas amostras usa-se o máximo
+    """
+    return _em_segundos(_latency_summary_ns(latencies_ns, moments))
+
+def _em_segundos(summary_ns: Dict[str, float]) -> Dict[str, float]:
+    """Converte um resumo de latências de nanossegundos para segundos"""
+    return {key: value / 1e9 for key, value in summary_ns.items()}
+
+def _latency_summary_ns(latencies: array, moments: LatencyMoments) -> Dict[str, float]:
+    """Estatísticas sobre as latências em nanossegundos (ver _latency_summary)"""
+    n = len(latencies)
+    summary = moments.summary_ns()
+
+    if NUMPY_AVAILABLE:
+        values = np.frombuffer(latencies, dtype=np.int64)
+
+        kth = sorted({pos for i, partes in _PERCENTIS
+                      for pos in _posicoes_percentil(n, i, partes)[:2]}) if n > 1 else [0]
+        median, p95, p99 = _percentis(_selecionar(values, kth), n)
+        minimum = float(values.min())
+        maximum = float(values.max())
+    else:
+        # Sem NumPy: uma única ordenação atende mediana, percentis, mínimo e máximo
+        ordered = sorted(latencies)
+        median, p95, p99 = _percentis(ordered, n)
+        minimum = ordered[0]
+        maximum = ordered[-1]
+
+    summary.update({
+        "median": float(median),
+        "min": minimum,
+        "max": maximum,
+        "p95": float(p95) if n >= 20 else maximum,
+        "p99": float(p99) if n >= 100 else maximum,
+    })
+    return summary
+
+# Modelo do relatório de get_summary_report, montado uma única vez: os
+# campos são chaves de calculate_metrics, já nas unidades exibidas
+_REPORT_TEMPLATE = """
+{separador}
+RELATÓRIO DE PERFORMANCE - {server_type_upper}
+{separador}
+
+📊 MÉTRICAS GERAIS:
+   • Total de requisições: {total_requests}
+   • Requisições bem-sucedidas: {successful_requests}
+   • Taxa de sucesso: {success_rate:.1%}
+   • Duração do teste: {test_duration_seconds:.2f}s
+
+🏁 LATÊNCIA (Response Time):
+   • Média: {mean_latency_ms:.2f}ms
+   • Mediana: {median_latency_ms:.2f}ms
+   • Desvio padrão: {latency_std_ms:.2f}ms
+   • Mínima: {min_latency_ms:.2f}ms
+   • Máxima: {max_latency_ms:.2f}ms
+   • 95º percentil: {latency_p95_ms:.2f}ms
+
+⚡ THROUGHPUT:
+   • Requisições/segundo: {throughput_rps:.2f} req/s
+   • Requisições/minuto: {throughput_rpm:.1f} req/min
+   • Throughput de sucesso: {successful_throughput_rps:.2f} req/s
+
+🔧 TEMPO DE SERVIÇO:
+   • Média: {mean_service_time_ms:.2f}ms
+   • Desvio padrão: {service_time_std_ms:.2f}ms
+
+📈 EFICIÊNCIA:
+   • Índice de performance: {performance_index:.4f}
+   • Eficiência do servidor: {server_efficiency:.4f}
+   • Coeficiente de variação: {latency_cov:.4f}
+
+⏰ ANÁLISE GERADA EM: {analysis_timestamp}
+{separador}
+""".replace('{separador}', '=' * 60)
 
 class PerformanceMetrics:
     """
@@ -39,22 +380,122 @@ class PerformanceMetrics:
     - Utilização do servidor (Server Utilization)
     """
 
-    def __init__(self):
-        self.requests: List[RequestMetrics] = []
+    def __init__(self, keep_requests: bool = True):
+        """
+        Args:
+            keep_requests: Se False, as requisições não são guardadas: só um
+                LatencyHistogram é mantido (memória constante, percentis
+                estimados e a lista requests fica vazia)
+        """
+        # Requisições armazenadas em colunas (structure of arrays): cada campo
+        # de RequestMetrics vira um array tipado, sem um objeto por requisição
+        self.request_ids = array('q')
+        self.start_times_ns = array('q')
+        self.end_times_ns = array('q')
+        self.response_times_ns = array('q')
+        self.status_codes = array('h')
+        self.successes = array('b')
+        self.moments = LatencyMoments()
+        self.server_type: str = "unknown"
         self.test_start_time: float = 0
         self.test_end_time: float = 0
 
+        # Instante da análise (ISO 8601), formatado uma única vez em end_test
+        self._analysis_timestamp = None
+
+        # Buffers por trabalhador ainda não mesclados
+        self._buffers: List[MetricsBuffer] = []
+
+        # Histograma que substitui as colunas quando keep_requests=False
+        self._histogram = None if keep_requests else LatencyHistogram()
+
+        # Último resultado de calculate_metrics e a chave com que foi calculado
+        self._metrics_cache = None
+        self._metrics_cache_key = None
+
+    def record(self, request_id: int, start_time_ns: int, end_time_ns: int,
+               response_time_ns: int, status_code: int, success: bool, server_type: str):
+        """Registra uma requisição diretamente nas colunas (caminho rápido, tempos em ns)"""
+        if self._histogram is not None:
+            if not self._histogram.count:
+                self.server_type = server_type
+            self._histogram.record(request_id, start_time_ns, end_time_ns,
+                                   response_time_ns, status_code, success)
+            return
+        if not self.request_ids:
+            self.server_type = server_type
+        self.request_ids.append(request_id)
+        self.start_times_ns.append(start_time_ns)
+        self.end_times_ns.append(end_time_ns)
+        self.response_times_ns.append(response_time_ns)
+        self.status_codes.append(status_code)
+        self.successes.append(success)
+        self.moments.add(response_time_ns, success)
+
     def add_request(self, request: RequestMetrics):
         """Adiciona uma requisição às métricas"""
-        self.requests.append(request)
+        self.record(request.request_id, request.start_time_ns, request.end_time_ns,
+                    request.response_time_ns, request.status_code, request.success,
+                    request.server_type)
+
+    def new_buffer(self, server_type: str) -> MetricsBuffer:
+        """Cria um buffer exclusivo para um trabalhador gravar sem sincronização"""
+        self.server_type = server_type
+        buffer = MetricsBuffer() if self._histogram is None else LatencyHistogram()
+        self._buffers.append(buffer)
+        return buffer
+
+    def _merge_buffers(self):
+        """Concatena os buffers dos trabalhadores nas colunas principais"""
+        if self._histogram is not None:
+            for buffer in self._buffers:
+                self._histogram.merge(buffer)
+            self._buffers = []
+            return
+        for buffer in self._buffers:
+            self.request_ids.extend(buffer.request_ids)
+            self.start_times_ns.extend(buffer.start_times_ns)
+            self.end_times_ns.extend(buffer.end_times_ns)
+            self.response_times_ns.extend(buffer.response_times_ns)
+            self.status_codes.extend(buffer.status_codes)
+            self.successes.extend(buffer.successes)
+            self.moments.merge(buffer.moments)
+        self._buffers = []
+
+    @property
+    def recorded_count(self) -> int:
+        """Total de requisições registradas, incluindo buffers não mesclados"""
+        merged = len(self.response_times_ns) if self._histogram is None else len(self._histogram)
+        return merged + sum(len(buffer) for buffer in self._buffers)
+
+    @property
+    def requests(self) -> List[RequestMetrics]:
+        """
+        Requisições registradas como objetos RequestMetrics (montados sob
+        demanda); vazia com keep_requests=False
+        """
+        return [
+            RequestMetrics(request_id, start, end, response_time, status_code, bool(success), self.server_type)
+            for request_id, start, end, response_time, status_code, success in zip(
+                self.request_ids, self.start_times_ns, self.end_times_ns,
+                self.response_times_ns, self.status_codes, self.successes)
+        ]
 
     def start_test(self):
         """Marca o início do teste"""
         self.test_start_time = time.time()
 
     def end_test(self):
-        """Marca o fim do teste"""
+        """Marca o fim do teste e consolida os buffers dos trabalhadores"""
         self.test_end_time = time.time()
+        self._analysis_timestamp = datetime.fromtimestamp(self.test_end_time).isoformat()
+        self._merge_buffers()
+        self._metrics_cache_key = None
+
+    @property
+    def analysis_timestamp(self) -> str:
+        """Fim do teste em ISO 8601 (ou o instante atual, se o teste não terminou)"""
+        return self._analysis_timestamp or datetime.now().isoformat()
 
     @property
     def test_duration(self) -> float:
@@ -67,20 +508,49 @@ class PerformanceMetrics:
         """
         Calcula todas as métricas de performance
 
+        O resultado é reaproveitado enquanto nenhuma requisição for registrada
+        e a duração do teste não mudar (relatório, exportação e comparações
+        chamam este método repetidamente)
+
         Returns:
             Dict contendo todas as métricas calculadas
         """
-        if not self.requests:
-            return self._empty_metrics()
+        duration = self.test_duration
+        key = (self.recorded_count, duration)
+        if self._metrics_cache_key == key:
+            return self._metrics_cache
+
+        metrics = self._compute_metrics(duration)
+        self._metrics_cache = metrics
+        self._metrics_cache_key = key
+        return metrics
 
-        # Métricas básicas
-        total_requests = len(self.requests)
-        successful_requests = len([r for r in self.requests if r.success])
-        failed_requests = total_requests - successful_requests
+    def _compute_metrics(self, duration: float) -> Dict[str, Any]:
+        """
+        Calcula as métricas (sem cache); a duração é lida uma única vez pelo
+        chamador, então todos os campos usam o mesmo valor mesmo com o teste
+        ainda em andamento
+        """
+        if self._histogram is not None:
+            if not self._histogram.count:
+                return self._empty_metrics()
+
+            # Somas acumuladas e percentis estimados pelo histograma
+            total_requests = self._histogram.count
+            successful_requests = self._histogram.ok_count
+            latency = _em_segundos(self._histogram.summary_ns())
+        else:
+            if not self.response_times_ns:
+                return self._empty_metrics()
+
+            # Métricas básicas
+            total_requests = len(self.response_times_ns)
+            successful_requests = self.moments.ok_count
 
-        # Latências de todas as requisições
-        latencies = [r.response_time for r in self.requests]
-        successful_latencies = [r.response_time for r in self.requests if r.success]
+            # Estatísticas das latências (todas e das bem-sucedidas)
+            latency = _latency_summary(self.response_times_ns, self.moments)
+        failed_requests = total_requests - successful_requests
+        throughput = total_requests / duration if duration > 0 else 0
 
         # Cálculos estatísticos
         metrics = {
@@ -88,7 +558,7 @@ class PerformanceMetrics:
             "total_requests": total_requests,
             "successful_requests": successful_requests,
             "failed_requests": failed_requests,
-            "test_duration_seconds": self.test_duration,
+            "test_duration_seconds": duration,
 
             # === TAXA DE SUCESSO ===
             "success_rate": successful_requests / total_requests if total_requests > 0 else 0,
@@ -96,40 +566,44 @@ class PerformanceMetrics:
 
             # === LATÊNCIA (RESPONSE TIME) ===
             # Latência média: μ = (1/n) * Σ(response_time_i)
-            "mean_latency_seconds": statistics.mean(latencies) if latencies else 0,
-            "mean_latency_ms": statistics.mean(latencies) * 1000 if latencies else 0,
+            "mean_latency_seconds": latency["mean"],
+            "mean_latency_ms": latency["mean"] * 1000,
 
             # Latência mediana
-            "median_latency_seconds": statistics.median(latencies) if latencies else 0,
-            "median_latency_ms": statistics.median(latencies) * 1000 if latencies else 0,
+            "median_latency_seconds": latency["median"],
+            "median_latency_ms": latency["median"] * 1000,
 
             # Desvio padrão da latência: σ = sqrt( (1/(n-1)) * Σ((x_i - μ)²) )
-            "latency_std_seconds": statistics.stdev(latencies) if len(latencies) > 1 else 0,
-            "latency_std_ms": statistics.stdev(latencies) * 1000 if len(latencies) > 1 else 0,
+            "latency_std_seconds": latency["std"],
+            "latency_std_ms": latency["std"] * 1000,
 
             # Latência mínima e máxima
-            "min_latency_seconds": min(latencies) if latencies else 0,
-            "min_latency_ms": min(latencies) * 1000 if latencies else 0,
-            "max_latency_seconds": max(latencies) if latencies else 0,
-            "max_latency_ms": max(latencies) * 1000 if latencies else 0,
+            "min_latency_seconds": latency["min"],
+            "min_latency_ms": latency["min"] * 1000,
+            "max_latency_seconds": latency["max"],
+            "max_latency_ms": latency["max"] * 1000,
 
             # Percentis (importantes para análise de performance)
-            "latency_p95_seconds": statistics.quantiles(latencies, n=20)[18] if len(latencies) >= 20 else max(latencies) if latencies else 0,  # 95th percentile
-            "latency_p99_seconds": statistics.quantiles(latencies, n=100)[98] if len(latencies) >= 100 else max(latencies) if latencies else 0,  # 99th percentile
+            "latency_p95_seconds": latency["p95"],  # 95th percentile
+            "latency_p95_ms": latency["p95"] * 1000,
+            "latency_p99_seconds": latency["p99"],  # 99th percentile
+            "latency_p99_ms": latency["p99"] * 1000,
 
             # === THROUGHPUT ===
             # Throughput: λ = total_requests / test_duration
-            "throughput_rps": total_requests / self.test_duration if self.test_duration > 0 else 0,  # requests per second
-            "throughput_rpm": (total_requests / self.test_duration) * 60 if self.test_duration > 0 else 0,  # requests per minute
+            "throughput_rps": throughput,  # requests per second
+            "throughput_rpm": throughput * 60,  # requests per minute
 
             # Throughput de sucesso
-            "successful_throughput_rps": successful_requests / self.test_duration if self.test_duration > 0 else 0,
+            "successful_throughput_rps": successful_requests / duration if duration > 0 else 0,
 
             # === TEMPO DE SERVIÇO ===
             # Service Time: tempo que o servidor gasta processando requisições
             # Para este projeto, service time ≈ response time (já que não temos medição separada)
-            "mean_service_time_seconds": statistics.mean(successful_latencies) if successful_latencies else 0,
-            "service_time_std_seconds": statistics.stdev(successful_latencies) if len(successful_latencies) > 1 else 0,
+            "mean_service_time_seconds": latency["service_mean"],
+            "mean_service_time_ms": latency["service_mean"] * 1000,
+            "service_time_std_seconds": latency["service_std"],
+            "service_time_std_ms": latency["service_std"] * 1000,
 
             # === UTILIZAÇÃO DO SERVIDOR ===
             # Server Utilization: U = (service_time * arrival_rate) / num_servers
@@ -138,15 +612,15 @@ class PerformanceMetrics:
 
             # === CONFIABILIDADE ===
             # Coefficient of Variation (CoV) da latência: CoV = σ/μ
-            "latency_cov": (statistics.stdev(latencies) / statistics.mean(latencies)) if latencies and statistics.mean(latencies) > 0 else 0,
+            "latency_cov": latency["std"] / latency["mean"] if latency["mean"] > 0 else 0,
 
             # === EFICIÊNCIA ===
             # Efficiency: E = throughput / (mean_latency * num_servers)
             # Maior eficiência = melhor distribuição de carga
 
             # === TIMESTAMP DA ANÁLISE ===
-            "analysis_timestamp": datetime.now().isoformat(),
-            "server_type": self.requests[0].server_type if self.requests else "unknown"
+            "analysis_timestamp": self.analysis_timestamp,
+            "server_type": self.server_type
         }
 
         # Cálculos adicionais que dependem de outras métricas
@@ -162,17 +636,16 @@ class PerformanceMetrics:
         mean_latency = base_metrics["mean_latency_seconds"]
         throughput = base_metrics["throughput_rps"]
 
-        if mean_latency > 0:
-            # Efficiency: quanto maior, melhor (mais requisições por unidade de latência)
-            advanced["server_efficiency"] = throughput / mean_latency
-        else:
-            advanced["server_efficiency"] = 0
+        # Efficiency: quanto maior, melhor (mais requisições por unidade de latência)
+        efficiency = throughput / mean_latency if mean_latency > 0 else 0
+        advanced["server_efficiency"] = efficiency
 
-        # Taxa de processamento (requests per second por segundo de latência média)
-        advanced["processing_rate"] = throughput * (1 / mean_latency) if mean_latency > 0 else 0
+        # Taxa de processamento (requests per second por segundo de latência média):
+        # algebricamente igual à eficiência, mantida por compatibilidade
+        advanced["processing_rate"] = efficiency
 
-        # Índice de performance (throughput / latência)
-        advanced["performance_index"] = throughput / base_metrics["mean_latency_ms"] if base_metrics["mean_latency_ms"] > 0 else 0
+        # Índice de performance (throughput / latência em ms) = eficiência / 1000
+        advanced["performance_index"] = efficiency / 1000
 
         return advanced
 
@@ -189,7 +662,7 @@ class PerformanceMetrics:
             "mean_latency_ms": 0,
             "throughput_rps": 0,
             "server_type": "unknown",
-            "analysis_timestamp": datetime.now().isoformat()
+            "analysis_timestamp": self.analysis_timestamp
         }
 
     def get_summary_report(self) -> str:
@@ -200,52 +673,15 @@ class PerformanceMetrics:
             String com relatório formatado
         """
         metrics = self.calculate_metrics()
-
-        report = f"""
-{'='*60}
-RELATÓRIO DE PERFORMANCE - {metrics['server_type'].upper()}
-{'='*60}
-
-📊 MÉTRICAS GERAIS:
-   • Total de requisições: {metrics['total_requests']}
-   • Requisições bem-sucedidas: {metrics['successful_requests']}
-   • Taxa de sucesso: {metrics['success_rate']:.1%}
-   • Duração do teste: {metrics['test_duration_seconds']:.2f}s
-
-🏁 LATÊNCIA (Response Time):
-   • Média: {metrics['mean_latency_ms']:.2f}ms
-   • Mediana: {metrics['median_latency_ms']:.2f}ms
-   • Desvio padrão: {metrics['latency_std_ms']:.2f}ms
-   • Mínima: {metrics['min_latency_ms']:.2f}ms
-   • Máxima: {metrics['max_latency_ms']:.2f}ms
-   • 95º percentil: {metrics['latency_p95_seconds']*1000:.2f}ms
-
-⚡ THROUGHPUT:
-   • Requisições/segundo: {metrics['throughput_rps']:.2f} req/s
-   • Requisições/minuto: {metrics['throughput_rpm']:.1f} req/min
-   • Throughput de sucesso: {metrics['successful_throughput_rps']:.2f} req/s
-
-🔧 TEMPO DE SERVIÇO:
-   • Média: {metrics['mean_service_time_seconds']*1000:.2f}ms
-   • Desvio padrão: {metrics['service_time_std_seconds']*1000:.2f}ms
-
-📈 EFICIÊNCIA:
-   • Índice de performance: {metrics['performance_index']:.4f}
-   • Eficiência do servidor: {metrics['server_efficiency']:.4f}
-   • Coeficiente de variação: {metrics['latency_cov']:.4f}
-
-⏰ ANÁLISE GERADA EM: {metrics['analysis_timestamp']}
-{'='*60}
-"""
-        return report
+        metrics = dict(metrics, server_type_upper=metrics['server_type'].upper())
+        return _REPORT_TEMPLATE.format_map(metrics)
 
     def export_to_json(self, filename: str):
         """Exporta métricas para arquivo JSON"""
-        import json
-        metrics = self.calculate_metrics()
+        data = _dumps_json(self.calculate_metrics())
 
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(metrics, f, indent=2, ensure_ascii=False)
+        with open(filename, 'wb') as f:
+            f.write(data)
 
         print(f"📄 Métricas exportadas para {filename}")
 
@@ -259,8 +695,16 @@ RELATÓRIO DE PERFORMANCE - {metrics['server_type'].upper()}
         Returns:
             Dict com métricas de comparação
         """
-        self_metrics = self.calculate_metrics()
-        other_metrics = other.calculate_metrics()
+        # Os dois cálculos são independentes e, com NumPy, o tempo fica quase
+        # todo em np.partition, que libera o GIL: com colunas grandes e mais
+        # de uma CPU, os dois lados são calculados em paralelo
+        if (NUMPY_AVAILABLE and other is not self and (os.cpu_count() or 1) > 1
+                and min(len(self.response_times_ns), len(other.response_times_ns)) >= _MIN_PARALLEL_COMPARE):
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                self_metrics, other_metrics = executor.map(PerformanceMetrics.calculate_metrics, (self, other))
+        else:
+            self_metrics = self.calculate_metrics()
+            other_metrics = other.calculate_metrics()
 
         comparison = {
             "comparison_timestamp": datetime.now().isoformat(),
@@ -296,6 +740,15 @@ RELATÓRIO DE PERFORMANCE - {metrics['server_type'].upper()}
         return comparison
 
 # Funções auxiliares para análise estatística
+# Valores z por nível de confiança (padrão: 95%, aproximadamente 1.96)
+_Z_SCORES = {0.90: 1.645, 0.95: 1.96, 0.99: 2.576}
+
+def _intervalo_confianca(mean: float, std: float, n: int, confidence: float = 0.95) -> tuple:
+    """Intervalo de confiança a partir de média, desvio padrão e tamanho já calculados"""
+    margin_error = _Z_SCORES.get(confidence, 1.96) * std * n ** -0.5
+
+    return (mean - margin_error, mean + margin_error)
+
 def calculate_confidence_interval(data: List[float], confidence: float = 0.95) -> tuple:
     """
     Calcula intervalo de confiança para uma lista de dados
@@ -310,17 +763,27 @@ def calculate_confidence_interval(data: List[float], confidence: float = 0.95) -
     if len(data) < 2:
         return (data[0], data[0]) if data else (0, 0)
 
-    mean = statistics.mean(data)
-    std = statistics.stdev(data)
-    n = len(data)
-
-    # Valor z para confiança de 95% (aproximadamente 1.96)
-    z_scores = {0.90: 1.645, 0.95: 1.96, 0.99: 2.576}
-    z = z_scores.get(confidence, 1.96)
-
-    margin_error = z * (std / math.sqrt(n))
-
-    return (mean - margin_error, mean + margin_error)
+    return _intervalo_confianca(statistics.mean(data), statistics.stdev(data), len(data), confidence)
+
+def _resumo_serie(values: List[float], with_interval: bool = True) -> Dict[str, Any]:
+    """Média, desvio padrão, mínimo, máximo (e intervalo de 95%) de uma série, cada um calculado uma vez"""
+    n = len(values)
+    if NUMPY_AVAILABLE:
+        series = np.asarray(values, dtype=np.float64)
+        mean = float(series.mean())
+        std = float(series.std(ddof=1)) if n > 1 else 0
+        minimum = float(series.min())
+        maximum = float(series.max())
+    else:
+        mean = statistics.mean(values)
+        std = statistics.stdev(values) if n > 1 else 0
+        minimum = min(values)
+        maximum = max(values)
+
+    summary = {"mean": mean, "std": std, "min": minimum, "max": maximum}
+    if with_interval:
+        summary["confidence_interval_95"] = _intervalo_confianca(mean, std, n) if n > 1 else (values[0], values[0])
+    return summary
 
 def analyze_performance_trends(metrics_list: List[PerformanceMetrics]) -> Dict[str, Any]:
     """
@@ -335,37 +798,15 @@ def analyze_performance_trends(metrics_list: List[PerformanceMetrics]) -> Dict[s
     if not metrics_list:
         return {}
 
-    throughputs = []
-    latencies = []
-    success_rates = []
-
-    for m in metrics_list:
-        calc_metrics = m.calculate_metrics()
-        throughputs.append(calc_metrics["throughput_rps"])
-        latencies.append(calc_metrics["mean_latency_ms"])
-        success_rates.append(calc_metrics["success_rate"])
+    # calculate_metrics é memoizado: no máximo um cálculo por objeto
+    get_fields = itemgetter("throughput_rps", "mean_latency_ms", "success_rate")
+    throughputs, latencies, success_rates = map(
+        list, zip(*(get_fields(m.calculate_metrics()) for m in metrics_list)))
 
     return {
-        "throughput_trend": {
-            "mean": statistics.mean(throughputs),
-            "std": statistics.stdev(throughputs) if len(throughputs) > 1 else 0,
-            "min": min(throughputs),
-            "max": max(throughputs),
-            "confidence_interval_95": calculate_confidence_interval(throughputs)
-        },
-        "latency_trend": {
-            "mean": statistics.mean(latencies),
-            "std": statistics.stdev(latencies) if len(latencies) > 1 else 0,
-            "min": min(latencies),
-            "max": max(latencies),
-            "confidence_interval_95": calculate_confidence_interval(latencies)
-        },
-        "success_rate_trend": {
-            "mean": statistics.mean(success_rates),
-            "std": statistics.stdev(success_rates) if len(success_rates) > 1 else 0,
-            "min": min(success_rates),
-            "max": max(success_rates)
-        },
+        "throughput_trend": _resumo_serie(throughputs),
+        "latency_trend": _resumo_serie(latencies),
+        "success_rate_trend": _resumo_serie(success_rates, with_interval=False),
         "num_tests": len(metrics_list)
     }
 
@@ -377,12 +818,13 @@ if __name__ == "__main__":
 
     # Simular algumas requisições
     for i in range(10):
-        latency = 0.1 + (i * 0.01)  # Latência crescente para teste
+        latency_ns = 100_000_000 + i * 10_000_000  # Latência crescente para teste
+        start_ns = time.perf_counter_ns()
         req = RequestMetrics(
             request_id=i,
-            start_time=time.time(),
-            end_time=time.time() + latency,
-            response_time=latency,
+            start_time_ns=start_ns,
+            end_time_ns=start_ns + latency_ns,
+            response_time_ns=latency_ns,
             status_code=200,
             success=True,
             server_type="sequential"
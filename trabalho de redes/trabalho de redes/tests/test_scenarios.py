@@ -5,7 +5,8 @@ Define diferentes cenários para comparar servidores sequencial e concorrente
 """
 
 from enum import Enum
-from typing import Dict, List, Any
+from types import MappingProxyType
+from typing import Dict, List, Any, Mapping
 from dataclasses import dataclass
 
 class LoadType(Enum):
@@ -20,7 +21,7 @@ class RequestType(Enum):
     SLOW = "slow"         # Requisições lentas (grandes dados/simulação processamento)
     MIXED = "mixed"       # Mix de requisições rápidas e lentas
 
-@dataclass
+@dataclass(frozen=True)
 class TestScenario:
     """Define um cenário de teste completo"""
     name: str
@@ -42,132 +43,136 @@ class TestScenario:
         """Duração esperada do teste (aproximada)"""
         return self.requests_per_client * self.delay_between_requests * self.num_clients
 
+def _define_scenarios() -> Dict[str, TestScenario]:
+    """Define todos os cenários de teste"""
+
+    scenarios = {}
+
+    # === CENÁRIOS DE CARGA LEVE ===
+    scenarios["light_fast"] = TestScenario(
+        name="Carga Leve - Requisições Rápidas",
+        description="Cenário com poucos clientes fazendo requisições rápidas (GET /)",
+        load_type=LoadType.LIGHT,
+        request_type=RequestType.FAST,
+        num_clients=3,
+        requests_per_client=20,
+        delay_between_requests=0.1,  # 100ms entre requisições
+        server_simulation_delay=0.001  # 1ms de processamento simulado
+    )
+
+    scenarios["light_slow"] = TestScenario(
+        name="Carga Leve - Requisições Lentas",
+        description="Cenário com poucos clientes fazendo requisições que exigem processamento",
+        load_type=LoadType.LIGHT,
+        request_type=RequestType.SLOW,
+        num_clients=3,
+        requests_per_client=10,
+        delay_between_requests=0.5,  # 500ms entre requisições
+        server_simulation_delay=0.1  # 100ms de processamento simulado
+    )
+
+    # === CENÁRIOS DE CARGA MÉDIA ===
+    scenarios["medium_fast"] = TestScenario(
+        name="Carga Média - Requisições Rápidas",
+        description="Cenário com número moderado de clientes fazendo requisições rápidas",
+        load_type=LoadType.MEDIUM,
+        request_type=RequestType.FAST,
+        num_clients=10,
+        requests_per_client=30,
+        delay_between_requests=0.05,  # 50ms entre requisições
+        server_simulation_delay=0.001  # 1ms de processamento simulado
+    )
+
+    scenarios["medium_slow"] = TestScenario(
+        name="Carga Média - Requisições Lentas",
+        description="Cenário com número moderado de clientes fazendo requisições que exigem processamento",
+        load_type=LoadType.MEDIUM,
+        request_type=RequestType.SLOW,
+        num_clients=8,
+        requests_per_client=15,
+        delay_between_requests=0.2,  # 200ms entre requisições
+        server_simulation_delay=0.05  # 50ms de processamento simulado
+    )
+
+    scenarios["medium_mixed"] = TestScenario(
+        name="Carga Média - Requisições Mistas",
+        description="Cenário com clientes fazendo mix de requisições rápidas e lentas",
+        load_type=LoadType.MEDIUM,
+        request_type=RequestType.MIXED,
+        num_clients=12,
+        requests_per_client=25,
+        delay_between_requests=0.1,  # 100ms entre requisições
+        server_simulation_delay=0.02  # 20ms de processamento médio simulado
+    )
+
+    # === CENÁRIOS DE CARGA PESADA ===
+    scenarios["heavy_fast"] = TestScenario(
+        name="Carga Pesada - Requisições Rápidas",
+        description="Cenário de stress com muitos clientes fazendo requisições rápidas",
+        load_type=LoadType.HEAVY,
+        request_type=RequestType.FAST,
+        num_clients=25,
+        requests_per_client=40,
+        delay_between_requests=0.01,  # 10ms entre requisições
+        server_simulation_delay=0.001  # 1ms de processamento simulado
+    )
+
+    scenarios["heavy_slow"] = TestScenario(
+        name="Carga Pesada - Requisições Lentas",
+        description="Cenário de stress com muitos clientes fazendo requisições que exigem processamento",
+        load_type=LoadType.HEAVY,
+        request_type=RequestType.SLOW,
+        num_clients=20,
+        requests_per_client=20,
+        delay_between_requests=0.1,  # 100ms entre requisições
+        server_simulation_delay=0.08  # 80ms de processamento simulado
+    )
+
+    scenarios["heavy_mixed"] = TestScenario(
+        name="Carga Pesada - Requisições Mistas",
+        description="Cenário de stress com muitos clientes fazendo mix de requisições",
+        load_type=LoadType.HEAVY,
+        request_type=RequestType.MIXED,
+        num_clients=30,
+        requests_per_client=35,
+        delay_between_requests=0.05,  # 50ms entre requisições
+        server_simulation_delay=0.03  # 30ms de processamento médio simulado
+    )
+
+    # === CENÁRIOS ESPECIAIS ===
+    scenarios["burst_load"] = TestScenario(
+        name="Carga em Burst",
+        description="Cenário simulando picos de carga repentinos",
+        load_type=LoadType.HEAVY,
+        request_type=RequestType.FAST,
+        num_clients=50,
+        requests_per_client=100,
+        delay_between_requests=0.001,  # 1ms entre requisições (muito rápido)
+        server_simulation_delay=0.001  # Processamento mínimo
+    )
+
+    scenarios["sequential_vs_concurrent"] = TestScenario(
+        name="Comparação Direta",
+        description="Cenário otimizado para comparar diretamente sequencial vs concorrente",
+        load_type=LoadType.MEDIUM,
+        request_type=RequestType.MIXED,
+        num_clients=15,
+        requests_per_client=50,
+        delay_between_requests=0.02,  # 20ms entre requisições
+        server_simulation_delay=0.01  # 10ms de processamento simulado
+    )
+
+    return scenarios
+
+# Cenários são estáticos: construídos uma única vez na importação do módulo e
+# compartilhados (somente leitura) por todas as instâncias de TestScenarios
+_SCENARIOS: Mapping[str, TestScenario] = MappingProxyType(_define_scenarios())
+
 class TestScenarios:
     """Gerenciador de cenários de teste"""
 
     def __init__(self):
-        self.scenarios = self._define_scenarios()
-
-    def _define_scenarios(self) -> Dict[str, TestScenario]:
-        """Define todos os cenários de teste"""
-
-        scenarios = {}
-
-        # === CENÁRIOS DE CARGA LEVE ===
-        scenarios["light_fast"] = TestScenario(
-            name="Carga Leve - Requisições Rápidas",
-            description="Cenário com poucos clientes fazendo requisições rápidas (GET /)",
-            load_type=LoadType.LIGHT,
-            request_type=RequestType.FAST,
-            num_clients=3,
-            requests_per_client=20,
-            delay_between_requests=0.1,  # 100ms entre requisições
-            server_simulation_delay=0.001  # 1ms de processamento simulado
-        )
-
-        scenarios["light_slow"] = TestScenario(
-            name="Carga Leve - Requisições Lentas",
-            description="Cenário com poucos clientes fazendo requisições que exigem processamento",
-            load_type=LoadType.LIGHT,
-            request_type=RequestType.SLOW,
-            num_clients=3,
-            requests_per_client=10,
-            delay_between_requests=0.5,  # 500ms entre requisições
-            server_simulation_delay=0.1  # 100ms de processamento simulado
-        )
-
-        # === CENÁRIOS DE CARGA MÉDIA ===
-        scenarios["medium_fast"] = TestScenario(
-            name="Carga Média - Requisições Rápidas",
-            description="Cenário com número moderado de clientes fazendo requisições rápidas",
-            load_type=LoadType.MEDIUM,
-            request_type=RequestType.FAST,
-            num_clients=10,
-            requests_per_client=30,
-            delay_between_requests=0.05,  # 50ms entre requisições
-            server_simulation_delay=0.001  # 1ms de processamento simulado
-        )
-
-        scenarios["medium_slow"] = TestScenario(
-            name="Carga Média - Requisições Lentas",
-            description="Cenário com número moderado de clientes fazendo requisições que exigem processamento",
-            load_type=LoadType.MEDIUM,
-            request_type=RequestType.SLOW,
-            num_clients=8,
-            requests_per_client=15,
-            delay_between_requests=0.2,  # 200ms entre requisições
-            server_simulation_delay=0.05  # 50ms de processamento simulado
-        )
-
-        scenarios["medium_mixed"] = TestScenario(
-            name="Carga Média - Requisições Mistas",
-            description="Cenário com clientes fazendo mix de requisições rápidas e lentas",
-            load_type=LoadType.MEDIUM,
-            request_type=RequestType.MIXED,
-            num_clients=12,
-            requests_per_client=25,
-            delay_between_requests=0.1,  # 100ms entre requisições
-            server_simulation_delay=0.02  # 20ms de processamento médio simulado
-        )
-
-        # === CENÁRIOS DE CARGA PESADA ===
-        scenarios["heavy_fast"] = TestScenario(
-            name="Carga Pesada - Requisições Rápidas",
-            description="Cenário de stress com muitos clientes fazendo requisições rápidas",
-            load_type=LoadType.HEAVY,
-            request_type=RequestType.FAST,
-            num_clients=25,
-            requests_per_client=40,
-            delay_between_requests=0.01,  # 10ms entre requisições
-            server_simulation_delay=0.001  # 1ms de processamento simulado
-        )
-
-        scenarios["heavy_slow"] = TestScenario(
-            name="Carga Pesada - Requisições Lentas",
-            description="Cenário de stress com muitos clientes fazendo requisições que exigem processamento",
-            load_type=LoadType.HEAVY,
-            request_type=RequestType.SLOW,
-            num_clients=20,
-            requests_per_client=20,
-            delay_between_requests=0.1,  # 100ms entre requisições
-            server_simulation_delay=0.08  # 80ms de processamento simulado
-        )
-
-        scenarios["heavy_mixed"] = TestScenario(
-            name="Carga Pesada - Requisições Mistas",
-            description="Cenário de stress com muitos clientes fazendo mix de requisições",
-            load_type=LoadType.HEAVY,
-            request_type=RequestType.MIXED,
-            num_clients=30,
-            requests_per_client=35,
-            delay_between_requests=0.05,  # 50ms entre requisições
-            server_simulation_delay=0.03  # 30ms de processamento médio simulado
-        )
-
-        # === CENÁRIOS ESPECIAIS ===
-        scenarios["burst_load"] = TestScenario(
-            name="Carga em Burst",
-            description="Cenário simulando picos de carga repentinos",
-            load_type=LoadType.HEAVY,
-            request_type=RequestType.FAST,
-            num_clients=50,
-            requests_per_client=100,
-            delay_between_requests=0.001,  # 1ms entre requisições (muito rápido)
-            server_simulation_delay=0.001  # Processamento mínimo
-        )
-
-        scenarios["sequential_vs_concurrent"] = TestScenario(
-            name="Comparação Direta",
-            description="Cenário otimizado para comparar diretamente sequencial vs concorrente",
-            load_type=LoadType.MEDIUM,
-            request_type=RequestType.MIXED,
-            num_clients=15,
-            requests_per_client=50,
-            delay_between_requests=0.02,  # 20ms entre requisições
-            server_simulation_delay=0.01  # 10ms de processamento simulado
-        )
-
-        return scenarios
+        self.scenarios = _SCENARIOS
 
     def get_scenario(self, scenario_id: str) -> TestScenario:
         """Retorna um cenário específico"""